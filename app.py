@@ -8,6 +8,20 @@ import plotly.express as px
 # Imports Plotly Express for data visualization
 import pandas as pd
 # Imports pandas for data handling and manipulation 
+from data import start_watcher
+# Shared data store; the watcher reloads workbooks the scraper has updated
+from flask import jsonify, request
+# Flask helpers for the JSON endpoints
+from best_deals import latest_deals, deal_records
+# Cross-catalog cheapest-platform table
+from metrics import init_app as init_metrics
+# Callback timing, Server-Timing headers and the /metrics endpoint
+from warmup import is_ready, readiness, start_warm_up
+# Background data loading and the readiness state
+from compression import init_app as init_compression
+# Opt-in gzip/brotli compression of the responses
+from dash.dependencies import Input, Output
+# Input and Output for the loading banner callback
 # External CSS files for styling 
 
 external_css = [ 
@@ -39,12 +53,56 @@ app.layout = html.Div([  # Main container Div for the layout
             for page in dash.page_registry.values()  # Loops through registered pages to generate links
         ]
     ),
+
+    # Notice shown while the workbooks are still being loaded; polled until the data is ready
+    html.Div(id='loading-banner'),
+    dcc.Interval(id='ready-poll', interval=1000),
     
     dash.page_container  # Container that holds the content of each page dynamically
 ], className="col-12 mx-auto")  # Bootstrap classes for full width and centered layout
 
+# Show the loading notice until the data is ready, then stop polling
+@app.callback(
+    [Output('loading-banner', 'children'), Output('ready-poll', 'disabled')],
+    Input('ready-poll', 'n_intervals')
+)
+def update_loading_banner(n_intervals):
+    if is_ready():
+        return None, True
+    return html.Div('Loading product data… charts will appear in a moment.',
+                    className="alert alert-secondary text-center m-2"), False
+
+# Flask server for production WSGI servers (see wsgi.py and gunicorn.conf.py)
+server = app.server
+init_metrics(server)
+init_compression(server)  # After the metrics hooks, so its timing lands in Server-Timing
+
+# Liveness: the process is up and serving requests
+@server.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok'})
+
+# Readiness: 503 until the data and the derived tables are loaded
+@server.route('/ready')
+def ready():
+    state = readiness()
+    return jsonify(state), 200 if state['ready'] else 503
+
+# JSON endpoint with the ranked latest best deals, e.g. /api/best-deals?type=Mobile&limit=10
+@server.route('/api/best-deals')
+def api_best_deals():
+    deals = latest_deals(
+        request.args.get('type'),
+        request.args.get('company'),
+        request.args.get('limit', type=int),
+    )
+    return jsonify(deal_records(deals))
+
 
 # Run the app
 if __name__ == '__main__':
+    start_watcher()  # Poll the data directory every ECOM_RELOAD_INTERVAL seconds
+    start_warm_up()  # Load the data in the background; the landing page is served meanwhile
+    # Development server only; use gunicorn with wsgi.py for production
     app.run(debug=True)  
 
@@ -0,0 +1,84 @@
+/* assets/charts.js
+ * Client-side rendering of the platform charts (enabled with ECOM_CLIENTSIDE=1).
+ * The server stores {dates, prices, rolling} of the selected product, the rolling means
+ * already computed over the days before the range; the functions below build the same
+ * line, histogram, box and rolling-mean figures as figures.py does on the server.
+ */
+
+(function () {
+    function layout(config, title, xTitle, yTitle, extra) {
+        return Object.assign({
+            template: config.template,
+            title: {text: title, x: 0.5},
+            xaxis: {title: {text: xTitle}},
+            yaxis: {title: {text: yTitle}}
+        }, extra || {});
+    }
+
+    function lineTrace(name, x, y, color) {
+        var trace = {type: 'scatter', mode: 'lines', name: name, x: x, y: y};
+        if (color) {
+            trace.line = {color: color};
+        }
+        return trace;
+    }
+
+    /* Equal-width bins between min and max, last bin closed (as numpy.histogram) */
+    function histogram(values, bins) {
+        var lo = Math.min.apply(null, values);
+        var hi = Math.max.apply(null, values);
+        if (lo === hi) {
+            lo -= 0.5;
+            hi += 0.5;
+        }
+        var width = (hi - lo) / bins;
+        var counts = new Array(bins).fill(0);
+        values.forEach(function (v) {
+            counts[Math.min(Math.floor((v - lo) / width), bins - 1)] += 1;
+        });
+        var centers = counts.map(function (_, i) { return lo + width * (i + 0.5); });
+        return {centers: centers, counts: counts, width: width};
+    }
+
+    function platformFigures(series, config) {
+        if (!series || !config) {
+            return [{}, {}, {}, {}];
+        }
+        var col = config.priceColumn;
+        var titles = config.titles;
+        var prices = series.prices.filter(function (p) { return p !== null; });
+        var rollingName = col + ' rolling ' + config.rollingWindow;
+
+        var line = {
+            data: [lineTrace(col, series.dates, series.prices, config.color)],
+            layout: layout(config, titles.line, 'Date', col, {showlegend: false})
+        };
+
+        var histData = [];
+        if (prices.length) {
+            var hist = histogram(prices, config.bins);
+            var bar = {type: 'bar', x: hist.centers, y: hist.counts, width: hist.width};
+            if (config.color) {
+                bar.marker = {color: config.color};
+            }
+            histData.push(bar);
+        }
+        var histFig = {data: histData, layout: layout(config, titles.histogram, col, 'count', {bargap: 0})};
+
+        var box = {
+            data: prices.length ? [{type: 'box', name: col, y: prices}] : [],
+            layout: layout(config, titles.box, null, col)
+        };
+
+        var rolling = {
+            data: [lineTrace(rollingName, series.dates, series.rolling)],
+            layout: layout(config, titles.rolling, 'Date', rollingName, {showlegend: false})
+        };
+
+        return [line, histFig, box, rolling];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        charts: {platformFigures: platformFigures}
+    });
+})();
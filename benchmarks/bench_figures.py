@@ -0,0 +1,63 @@
+# Benchmark: Plotly Express figures vs. the figure dicts built by figures.py.
+# Builds and serializes the price comparison line + box charts for every product
+# both ways and prints the per-figure time and payload size.
+#
+#   python benchmarks/bench_figures.py [--repeat 5]
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plotly.express as px  # noqa: E402
+import plotly.io as pio  # noqa: E402
+
+from data import get_products, PRICE_COLUMNS  # noqa: E402
+from figures import line_figure, box_figure  # noqa: E402
+
+
+# The Plotly Express path the pages used before figures.py
+def build_px(product_df, name):
+    fig_line = px.line(product_df, x='Date', y=PRICE_COLUMNS, title=f'Price Comparison for {name}',
+                       labels={'value': 'Price', 'variable': 'Platform'})
+    fig_box = px.box(product_df, y=PRICE_COLUMNS, title=f'Price Distribution for {name}', points='outliers')
+    fig_line.update_layout(title_x=0.5, template='plotly_dark')
+    fig_box.update_layout(title_x=0.5, template='plotly_dark')
+    return fig_line, fig_box
+
+
+def build_dicts(product_df, name):
+    fig_line = line_figure(product_df['Date'], {col: product_df[col] for col in PRICE_COLUMNS},
+                           f'Price Comparison for {name}', 'Date', 'Price', legend_title='Platform')
+    fig_box = box_figure({col: product_df[col] for col in PRICE_COLUMNS}, f'Price Distribution for {name}')
+    return fig_line, fig_box
+
+
+def run(build, products, repeat):
+    timings, sizes = [], []
+    for _ in range(repeat):
+        for name, product_df in products:
+            start = time.perf_counter()
+            payloads = [pio.to_json(fig, validate=False) for fig in build(product_df, name)]
+            timings.append((time.perf_counter() - start) / len(payloads))
+            sizes.extend(len(p) for p in payloads)
+    return statistics.median(timings) * 1000, statistics.mean(sizes) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Plotly Express with figures.py')
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the catalog per builder')
+    args = parser.parse_args()
+
+    df = get_products()
+    products = [(name, rows.sort_values('Date')) for name, rows in df.groupby('Product Name', observed=True)]
+    print(f'{len(products)} products, {args.repeat} passes')
+    for label, build in [('plotly express', build_px), ('figures.py', build_dicts)]:
+        ms, kb = run(build, products, args.repeat)
+        print(f'{label:>15}: {ms:8.2f} ms/figure (median)  {kb:7.1f} KiB/figure (mean)')
+
+
+if __name__ == '__main__':
+    main()
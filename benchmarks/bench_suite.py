@@ -0,0 +1,261 @@
+# Benchmark suite: boot time, callback latency, figure payload size and peak memory.
+# Every catalog scale runs in its own Python process (so boot time and RSS are measured
+# from a cold start) and drives the registered page callbacks directly, first with empty
+# caches and then warm. Scaled-up catalogs are synthetic: every workbook is repeated
+# 'scale' times, either as renamed copies of its products ('products') or as older
+# history of the same products ('history'). Results are written as JSON and can be
+# compared with an earlier run.
+#
+#   python benchmarks/bench_suite.py [--scales 1 10 100] [--scale-by products]
+#                                    [--products 20] [--storage memory|sqlite]
+#                                    [--output results.json] [--compare old_results.json]
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+####################### SYNTHETIC CATALOGS #######################
+
+# Repeat one tagged workbook frame 'scale' times
+def scale_workbook(df, scale, scale_by, seed):
+    import numpy as np
+    import pandas as pd
+    from data import PRICE_COLUMNS
+
+    rng = np.random.default_rng(seed)
+    span = df['Date'].max() - df['Date'].min() + pd.Timedelta(days=1)
+    copies = [df]
+    for k in range(1, scale):
+        copy = df.copy()
+        if scale_by == 'history':
+            copy['Date'] = copy['Date'] - span * k
+        else:
+            copy['Product Name'] = copy['Product Name'].astype(str) + f' #{k}'
+        # Jitter the prices a little so every copy is a different series
+        for col in PRICE_COLUMNS:
+            copy[col] = (copy[col] * rng.uniform(0.95, 1.05, len(copy))).round()
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+# Publish a scaled copy of the workbooks as the shared data
+def publish_scaled(scale, scale_by):
+    import data
+
+    data.get_data_version()
+    with data._lock:
+        tagged, stamps = data._read_tagged(data.discover_workbooks())
+        workbooks = {filename: scale_workbook(df, scale, scale_by, seed)
+                     for seed, (filename, df) in enumerate(tagged.items())}
+        data._publish(workbooks, stamps)
+
+####################### MEASUREMENTS #############################
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Resident memory right now (Linux only; None elsewhere)
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        return None
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'calls': len(timings),
+    }
+
+
+# The figure-returning callbacks of every page, as name -> function(product)
+def page_callbacks():
+    modules = sys.modules
+    platform_page = modules['pages.platform_analytics']
+    callbacks = {}
+    for page in platform_page.PLATFORM_PAGES:
+        version_id = {'type': 'platform-version', 'platform': page['key']}
+        callbacks[f"{page['key']}_analytics.update_graphs"] = (
+            lambda product, version_id=version_id: platform_page.update_graphs(product, None, None, version_id))
+    callbacks['price-comparison.update_price_graph'] = modules['pages.price-comparison'].update_price_graph
+    callbacks['discount-comparison.update_discount_graph'] = modules['pages.discount-comparison'].update_discount_graph
+    return callbacks
+
+
+def time_callback(callback, products, to_json):
+    from compression import compress
+
+    timings, sizes, compressed = [], [], []
+    for product in products:
+        start = time.perf_counter()
+        figures = callback(product)
+        timings.append(time.perf_counter() - start)
+        payload = to_json(list(figures)).encode()
+        sizes.append(len(payload))
+        compressed.append(len(compress(payload, 'gzip')))
+    return timings, sizes, compressed
+
+
+# Measure one catalog scale in this process (boot is timed from interpreter start)
+def run_child(scale, scale_by, n_products, storage):
+    import logging
+    logging.disable(logging.INFO)
+
+    boot_start = time.perf_counter()
+    import app
+    from plotly.io.json import to_json_plotly
+
+    import figure_cache
+    import storage as storage_module
+    from data import get_catalog, get_data_version, get_database, get_products
+
+    client = app.server.test_client()
+    client.get('/')
+    client.get('/_dash-layout')
+    get_data_version()
+    boot_s = time.perf_counter() - boot_start
+
+    publish_s = None
+    if scale > 1:
+        start = time.perf_counter()
+        publish_scaled(scale, scale_by)
+        publish_s = time.perf_counter() - start
+
+    # With SQLite storage the table is not read into memory just to count it
+    df = None if storage == 'sqlite' else get_products()
+    rows = storage_module.count_rows(get_database()) if df is None else len(df)
+    names = [p for companies in get_catalog().values() for products in companies.values() for p in products]
+    step = max(1, len(names) // n_products)
+    sample = names[::step][:n_products]
+
+    callbacks = {}
+    for name, callback in page_callbacks().items():
+        figure_cache.clear()
+        # The first call also builds the per-version tables (product_stats, ...)
+        first_start = time.perf_counter()
+        callback(sample[0])
+        first_s = time.perf_counter() - first_start
+
+        cold, sizes, compressed = time_callback(callback, sample, to_json_plotly)
+        warm, _, _ = time_callback(callback, sample, to_json_plotly)
+        callbacks[name] = {
+            'first_call_ms': round(first_s * 1000, 3),
+            'cold': summarize(cold[1:] or cold),
+            'warm': summarize(warm),
+            'payload_kib': round(statistics.mean(sizes) / 1024, 2),
+            'payload_gzip_kib': round(statistics.mean(compressed) / 1024, 2),
+        }
+
+    # Server-side paging of the Dataset table (first page, then a filtered and sorted page)
+    dataset = sys.modules['pages.dataset']
+    table = []
+    for _ in range(5):
+        start = time.perf_counter()
+        dataset.update_table(0, 10, [{'column_id': 'Price On Amazon', 'direction': 'desc'}],
+                             '{Type} contains Mobile')
+        table.append(time.perf_counter() - start)
+    callbacks['dataset.update_table'] = {'warm': summarize(table)}
+
+    return {
+        'scale': scale,
+        'scale_by': scale_by,
+        'storage': storage,
+        'rows': rows,
+        'products': len(names),
+        'sampled_products': len(sample),
+        'boot_s': round(boot_s, 3),
+        'publish_scaled_s': None if publish_s is None else round(publish_s, 3),
+        'frame_mb': None if df is None else round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'rss_mb': None if rss_mb() is None else round(rss_mb(), 1),
+        'callbacks': callbacks,
+    }
+
+####################### REPORT ###################################
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result, baseline=None):
+    print(f"scale {result['scale']}x ({result['scale_by']}, {result.get('storage', 'memory')}): "
+          f"{result['rows']} rows, {result['products']} products, boot {result['boot_s']:.2f}s, "
+          f"peak RSS {result['peak_rss_mb']:.0f} MB, RSS {result.get('rss_mb') or 0:.0f} MB")
+    for name, stats in result['callbacks'].items():
+        line = f"  {name:<45} warm {stats['warm']['median_ms']:8.2f} ms"
+        if 'cold' in stats:
+            line += f"  cold {stats['cold']['median_ms']:8.2f} ms  {stats['payload_kib']:7.1f} KiB ({stats['payload_gzip_kib']:.1f} gzip)"
+        if baseline and name in baseline['callbacks']:
+            old = baseline['callbacks'][name]['cold' if 'cold' in stats else 'warm']['median_ms']
+            new = stats['cold' if 'cold' in stats else 'warm']['median_ms']
+            line += f"  ({new / old:5.2f}x vs baseline)" if old else ''
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark boot time, callbacks, payloads and memory')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help='catalog size multipliers')
+    parser.add_argument('--scale-by', choices=['products', 'history'], default='products',
+                        help='repeat the products under new names or as older history')
+    parser.add_argument('--products', type=int, default=20, help='products sampled per callback')
+    parser.add_argument('--storage', choices=['memory', 'sqlite'], default='memory',
+                        help='storage backend of the product table (ECOM_STORAGE)')
+    parser.add_argument('--output', default='benchmark_results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        json.dump(run_child(args.child, args.scale_by, args.products, args.storage), sys.stdout)
+        return
+
+    baselines = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baselines = {(r['scale'], r['scale_by'], r.get('storage', 'memory')): r for r in json.load(f)['results']}
+
+    results = []
+    for scale in args.scales:
+        cmd = [sys.executable, os.path.abspath(__file__), '--child', str(scale),
+               '--scale-by', args.scale_by, '--products', str(args.products), '--storage', args.storage]
+        env = dict(os.environ, ECOM_STORAGE=args.storage)
+        out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, env=env)
+        if out.returncode != 0:
+            sys.stderr.write(out.stderr)
+            sys.exit(f'scale {scale}x failed')
+        result = json.loads(out.stdout)
+        results.append(result)
+        print_result(result, baselines.get((scale, args.scale_by, args.storage)))
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# Cross-catalog best-deal engine.
+# For every product and date it works out the cheapest platform, the gap to the most
+# expensive one and the saving against the listed MRP, in one vectorized pass over the
+# price, MRP and discount columns of the whole frame (no per-product filtering). The
+# table is computed once per data version, like the product_stats tables.
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data import get_database, get_products, get_data_version, PLATFORMS, PRICE_COLUMNS, MRP_COLUMNS, DISCOUNT_COLUMNS
+from metrics import observe_load
+from storage import latest_listed_rows, use_sqlite
+
+DEAL_COLUMNS = [
+    'Product Name', 'Type', 'Company', 'Date', 'Best Platform', 'Best Price', 'Highest Price',
+    'Spread', 'Spread (%)', 'MRP', 'Savings vs MRP', 'Discount (%)', 'Platforms Listed',
+]
+
+# Column the latest deals are ranked by (largest first)
+RANK_COLUMN = 'Spread (%)'
+
+####################### BUILD TABLE ##############################
+
+def build_deals(df):
+    # (rows x platforms) price matrix; a missing or zero price means "not listed there"
+    prices = df[PRICE_COLUMNS].to_numpy(dtype='float64')
+    prices[~(prices > 0)] = np.nan
+    listed = ~np.isnan(prices)
+    any_listed = listed.any(axis=1)
+    df, prices, listed = df[any_listed], prices[any_listed], listed[any_listed]
+
+    rows = np.arange(len(prices))
+    best = np.nanargmin(prices, axis=1)
+    best_price = prices[rows, best]
+    highest_price = np.nanmax(prices, axis=1)
+    spread = highest_price - best_price
+    mrp = df[MRP_COLUMNS].to_numpy(dtype='float64')[rows, best]
+    discount = df[DISCOUNT_COLUMNS].to_numpy(dtype='float64')[rows, best]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread_pct = np.where(highest_price > 0, spread / highest_price * 100, 0.0)
+
+    deals = pd.DataFrame({
+        'Product Name': df['Product Name'].to_numpy(),
+        'Type': df['Type'].to_numpy(),
+        'Company': df['Company'].to_numpy(),
+        'Date': df['Date'].to_numpy(),
+        'Best Platform': pd.Categorical.from_codes(best, PLATFORMS),
+        'Best Price': best_price,
+        'Highest Price': highest_price,
+        'Spread': spread,
+        'Spread (%)': spread_pct.round(2),
+        'MRP': mrp,
+        'Savings vs MRP': np.clip(mrp - best_price, 0, None),
+        'Discount (%)': discount.round(2),
+        'Platforms Listed': listed.sum(axis=1),
+    })
+    return deals.sort_values(['Product Name', 'Date'], kind='stable', ignore_index=True)
+
+####################### LOOKUPS ##################################
+_deals = None  # Table of the data version in _deals['version']
+_lock = threading.Lock()
+
+
+def get_deals():
+    global _deals
+    version = get_data_version()
+    if _deals is None or _deals['version'] != version:
+        with _lock:
+            if _deals is None or _deals['version'] != version:
+                start = time.perf_counter()
+                # With SQLite storage only the last listed row of each product is read,
+                # so 'all' holds just those rows
+                if use_sqlite():
+                    deals = build_deals(latest_listed_rows(get_database(), PRICE_COLUMNS))
+                else:
+                    deals = build_deals(get_products())
+                # Last scraped row of every product, best opportunities first
+                latest = deals.drop_duplicates('Product Name', keep='last')
+                latest = latest.sort_values(RANK_COLUMN, ascending=False, kind='stable', ignore_index=True)
+                _deals = {'all': deals, 'latest': latest, 'version': version}
+                observe_load('best_deals', time.perf_counter() - start)
+    return _deals
+
+
+# Ranked "where is it cheapest right now" table, optionally for one type / company
+def latest_deals(selected_type=None, company=None, limit=None):
+    latest = get_deals()['latest']
+    if selected_type:
+        latest = latest[latest['Type'] == selected_type]
+    if company:
+        latest = latest[latest['Company'] == company]
+    return latest.head(limit) if limit else latest
+
+
+# JSON-ready rows (dates as dd-mm-yyyy strings, like the Dataset page)
+def deal_records(deals):
+    records = deals.astype({'Product Name': str, 'Type': str, 'Company': str, 'Best Platform': str})
+    records['Date'] = records['Date'].dt.strftime('%d-%m-%Y')
+    return records.to_dict('records')
@@ -0,0 +1,48 @@
+# Client-side rendering mode for the platform pages.
+# With ECOM_CLIENTSIDE=1 a platform page sends the selected product's dates, prices and
+# rolling means into a dcc.Store once, and assets/charts.js builds the line, histogram, box and
+# rolling-mean charts in the browser. The page's static chart settings (titles, colors,
+# the dark template) travel once with the layout in a second store.
+import os
+
+import numpy as np
+
+from figures import DARK_TEMPLATE, to_array
+from product_stats import product_series, rolling_column, HISTOGRAM_BINS
+
+# Render the platform charts in the browser instead of on the server
+CLIENTSIDE = os.environ.get('ECOM_CLIENTSIDE', '0') == '1'
+
+# Name of the JavaScript namespace and function in assets/charts.js
+NAMESPACE = 'charts'
+PLATFORM_FIGURES = 'platformFigures'
+
+
+# Static settings for charts.js; 'titles' maps line/histogram/box/rolling to chart titles
+def chart_config(price_col, titles, color=None, rolling_window=3):
+    return {
+        'template': DARK_TEMPLATE,
+        'priceColumn': price_col,
+        'titles': titles,
+        'color': color,
+        'rollingWindow': rolling_window,
+        'bins': HISTOGRAM_BINS,
+    }
+
+
+def _values(column):
+    return [None if np.isnan(v) else v for v in column.to_numpy(dtype='float64').tolist()]
+
+
+# Columnar arrays of one product within a date range for the browser (None when the
+# product is unknown). The rolling means are the precomputed ones, so like the server
+# charts they include the days before the range.
+def product_arrays(product_name, price_col, start_date=None, end_date=None, rolling_window=3):
+    series = product_series(product_name, start_date, end_date)
+    if series.empty:
+        return None
+    return {
+        'dates': to_array(series['Date']),
+        'prices': _values(series[price_col]),
+        'rolling': _values(series[rolling_column(price_col, rolling_window)]),
+    }
@@ -0,0 +1,100 @@
+# Opt-in compression of the server's responses (ECOM_COMPRESS=1).
+# Callback responses carry Plotly JSON and the Dataset pages carry table rows; both shrink
+# several times under gzip. Brotli is used instead when the browser accepts it and the
+# 'brotli' package is installed. Responses below the size threshold are sent as they are.
+import gzip
+import os
+import time
+
+from flask import request
+
+from metrics import inc, server_timing
+
+try:  # brotli is optional; gzip from the standard library is always available
+    import brotli
+except ImportError:
+    brotli = None
+
+####################### CONFIGURATION ###########################
+COMPRESS = os.environ.get('ECOM_COMPRESS', '0') == '1'
+
+# Smallest response body (bytes) worth compressing
+MIN_BYTES = int(os.environ.get('ECOM_COMPRESS_MIN_BYTES', 1024))
+
+GZIP_LEVEL = int(os.environ.get('ECOM_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('ECOM_BROTLI_QUALITY', 5))
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/javascript', 'text/javascript',
+    'text/html', 'text/css', 'text/plain', 'image/svg+xml',
+}
+
+# The Dash JavaScript bundles never change while the server runs, so their compressed
+# bodies are kept: (path, encoding) -> bytes
+_bundles = {}
+
+####################### ENCODING #################################
+
+# Encodings the client accepts (ignoring the ones it disables with q=0)
+def _accepted(header):
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = _accepted(header or '')
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+####################### FLASK HOOK ###############################
+
+def _compress_response(response):
+    if (response.direct_passthrough or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    data = response.get_data()
+    if encoding is None or len(data) < MIN_BYTES:
+        return response
+
+    start = time.perf_counter()
+    if request.path.startswith('/_dash-component-suites/'):
+        key = (request.full_path, encoding)
+        body = _bundles.get(key)
+        if body is None:
+            body = _bundles[key] = compress(data, encoding)
+    else:
+        body = compress(data, encoding)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+
+    # Bytes before and after, as counters on /metrics and in the Server-Timing header
+    inc('ecom_compression_input_bytes_total', len(data), encoding=encoding)
+    inc('ecom_compression_output_bytes_total', len(body), encoding=encoding)
+    server_timing('compress', time.perf_counter() - start, f'{encoding} {len(data)}->{len(body)} bytes')
+    return response
+
+
+# Compress the server's responses when ECOM_COMPRESS=1. Install it after the metrics
+# hooks: Flask runs after-request hooks in reverse order, so this one runs first and its
+# Server-Timing entry still makes it into the header.
+def init_app(server):
+    if COMPRESS:
+        server.after_request(_compress_response)
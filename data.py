@@ -0,0 +1,570 @@
+# Shared product data store used by every page of the dashboard.
+# The workbooks are read and tagged once per process; pages ask this module for the
+# combined DataFrame instead of calling pd.read_excel themselves.
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from metrics import inc, observe_load, set_gauge
+from storage import read_table, use_sqlite, write_database
+
+try:  # pyarrow is only needed for the on-disk workbook cache
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+####################### CONFIGURATION ###########################
+# Directory holding the scraped .xlsx workbooks (defaults to the folder of this file)
+DATA_DIR = os.environ.get('ECOM_DATA_DIR', os.path.dirname(os.path.abspath(__file__)))
+
+# Manifest mapping workbook file globs to their product category and brand (see below)
+MANIFEST_PATH = os.environ.get('ECOM_CATALOG_MANIFEST', os.path.join(DATA_DIR, 'catalog.json'))
+
+# Columnar copies of the workbooks are kept here; set ECOM_CACHE_DIR to '' to disable
+CACHE_DIR = os.environ.get('ECOM_CACHE_DIR', os.path.join(DATA_DIR, '.xlsx_cache'))
+
+# Where the SQLite databases go when ECOM_STORAGE=sqlite (see storage.py)
+SQLITE_DIR = os.environ.get('ECOM_SQLITE_DIR', CACHE_DIR or DATA_DIR)
+
+# Processes used to parse workbooks that are not cached yet (1 = read in this process)
+INGEST_WORKERS = int(os.environ.get('ECOM_INGEST_WORKERS', os.cpu_count() or 1))
+
+PLATFORMS = ['Amazon', 'Flipkart', 'Jiomart']
+PRICE_COLUMNS = [f'Price On {p}' for p in PLATFORMS]
+DISCOUNT_COLUMNS = [f'Discount On {p}' for p in PLATFORMS]
+MRP_COLUMNS = [f'MRP On {p}' for p in PLATFORMS]
+LABEL_COLUMNS = ['Product Name', 'Type', 'Company']
+
+# Columns every workbook must have; any other columns are kept as they are
+REQUIRED_COLUMNS = ['Date', 'Product Name'] + PRICE_COLUMNS + MRP_COLUMNS + DISCOUNT_COLUMNS
+
+# Most product versions the comparison pages plot together
+MAX_COMPARE = int(os.environ.get('ECOM_MAX_COMPARE', 6))
+
+####################### CATALOG MANIFEST #########################
+# catalog.json lists file globs (relative to DATA_DIR) with the Type and Company of the
+# workbooks they match:
+#   {"workbooks": [{"glob": "iphone*.xlsx", "type": "Mobile", "company": "iPhone"}, ...]}
+# A workbook is tagged by the first entry matching it, and the entries' order is the order
+# the products appear in. A product line is added by dropping its workbook into DATA_DIR
+# (plus a manifest entry if no glob matches it); the watcher picks it up on its next check.
+
+def read_manifest(path=None):
+    path = path or MANIFEST_PATH
+    with open(path) as f:
+        manifest = json.load(f)
+    entries = manifest.get('workbooks') if isinstance(manifest, dict) else None
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected an object with a 'workbooks' list")
+    for i, entry in enumerate(entries):
+        missing = [key for key in ('glob', 'type', 'company')
+                   if not isinstance(entry, dict) or not isinstance(entry.get(key), str)]
+        if missing:
+            raise ValueError(f"{path}: workbook entry {i} needs {', '.join(missing)}")
+    return entries
+
+
+# (file name, Type, Company) of every workbook the manifest matches, in manifest order
+def discover_workbooks(entries=None):
+    entries = read_manifest() if entries is None else entries
+    found, seen = [], set()
+    for entry in entries:
+        for path in sorted(glob.glob(os.path.join(DATA_DIR, entry['glob']), recursive=True)):
+            filename = os.path.relpath(path, DATA_DIR)
+            # Skip directories and the lock files Excel leaves next to open workbooks
+            if filename in seen or os.path.basename(filename).startswith('~$') or not os.path.isfile(path):
+                continue
+            seen.add(filename)
+            found.append((filename, entry['type'], entry['company']))
+    return found
+
+####################### WORKBOOK CACHE ###########################
+# Each workbook gets a <name>.parquet copy plus a <name>.json sidecar recording the
+# mtime, size and sha256 of the .xlsx it was built from. A matching mtime/size is
+# trusted straight away; otherwise the hash decides whether the workbook really changed.
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(filename):
+    stem = os.path.splitext(filename)[0].replace(os.sep, '__')
+    return os.path.join(CACHE_DIR, stem + '.parquet'), os.path.join(CACHE_DIR, stem + '.json')
+
+
+def _write_atomic(path, write):
+    # Write to a temporary file first so concurrent workers never read half a file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_meta(meta_path, meta):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+    _write_atomic(meta_path, write)
+
+
+# Return the cached frame for a workbook, or None when it has to be re-read
+def _read_cached(path, filename):
+    parquet_path, meta_path = _cache_paths(filename)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(parquet_path):
+        return None
+
+    stat = os.stat(path)
+    if (meta.get('mtime'), meta.get('size')) != (stat.st_mtime, stat.st_size):
+        # Touched or copied without changing content: refresh the stamp and keep the cache
+        if meta.get('sha256') != _file_sha256(path):
+            return None
+        meta.update(mtime=stat.st_mtime, size=stat.st_size)
+        try:
+            _write_meta(meta_path, meta)
+        except OSError:
+            pass
+    try:
+        return pd.read_parquet(parquet_path)
+    except (OSError, ValueError, pyarrow.ArrowException) as exc:
+        # A truncated or corrupt cache file: parse the workbook again, which rewrites it
+        logger.warning('Ignoring the cached copy of %s: %s', filename, exc)
+        return None
+
+
+def _write_cache(path, filename, product_df):
+    parquet_path, meta_path = _cache_paths(filename)
+    stat = os.stat(path)
+    meta = {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': _file_sha256(path)}
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_atomic(parquet_path, lambda p: product_df.to_parquet(p, index=False))
+        _write_meta(meta_path, meta)
+    except (OSError, ValueError, pyarrow.ArrowException) as exc:
+        # A read-only data directory, or object columns mixing numbers and text (which
+        # Parquet cannot store), just mean no cache for this workbook
+        logger.warning('Not caching %s: %s', filename, exc)
+
+
+def _cache_enabled():
+    return bool(CACHE_DIR) and pyarrow is not None
+
+
+# Parse a workbook with openpyxl and refresh its cache entry (also runs in pool workers)
+def parse_workbook(filename):
+    path = os.path.join(DATA_DIR, filename)
+    product_df = pd.read_excel(path)
+    if _cache_enabled():
+        _write_cache(path, filename, product_df)
+    return product_df
+
+
+####################### VALIDATION #############################
+# A workbook must have every REQUIRED_COLUMNS column with dates and numbers in them.
+# Numbers are cast to 32 bits as each workbook arrives, so the raw 64-bit frames are
+# never all held at once; rows without a date or product name are dropped.
+
+def validate_workbook(filename, product_df):
+    missing = [col for col in REQUIRED_COLUMNS if col not in product_df.columns]
+    if missing:
+        raise ValueError(f"missing column(s) {', '.join(missing)}")
+
+    product_df = product_df.copy()
+    product_df['Date'] = pd.to_datetime(product_df['Date'], errors='coerce')
+    for col in PRICE_COLUMNS + MRP_COLUMNS + DISCOUNT_COLUMNS:
+        values = pd.to_numeric(product_df[col], errors='coerce')
+        if (values.isna() & product_df[col].notna()).any():
+            raise ValueError(f'non-numeric values in {col!r}')
+        product_df[col] = values.astype('float32' if col in DISCOUNT_COLUMNS else _price_dtype(values))
+
+    complete = product_df['Date'].notna() & product_df['Product Name'].notna()
+    if not complete.all():
+        logger.warning('%s: dropped %d row(s) without a date or product name', filename, (~complete).sum())
+        product_df = product_df[complete]
+    if product_df.empty:
+        raise ValueError('no rows')
+    return product_df.reset_index(drop=True)
+
+####################### STREAMING READER #########################
+
+# Validated frame of one workbook, read from the columnar cache when possible.
+# Returns (frame, seconds, parsed); with 'cached_only' a cache miss returns None.
+def load_workbook(filename, cached_only=False):
+    start = time.perf_counter()
+    product_df = None
+    if _cache_enabled():
+        product_df = _read_cached(os.path.join(DATA_DIR, filename), filename)
+    parsed = product_df is None
+    if parsed:
+        if cached_only:
+            return None
+        product_df = parse_workbook(filename)
+    return validate_workbook(filename, product_df), time.perf_counter() - start, parsed
+
+
+# Pool worker: a failure is returned as a message so the other workbooks still load
+def _load_safe(filename):
+    try:
+        return load_workbook(filename)
+    except Exception as exc:
+        return f'{type(exc).__name__}: {exc}'
+
+
+# Read and validate workbooks one at a time, yielding (file name, frame, error message)
+# as each becomes available: cache hits are read here first, then the remaining
+# workbooks are parsed by a process pool so one large file no longer holds up
+# everything queued behind it. A workbook that fails comes back with frame None.
+def stream_workbooks(filenames, workers=None):
+    start = time.perf_counter()
+    misses = []
+    for filename in filenames:
+        try:
+            result = load_workbook(filename, cached_only=True)
+        except Exception as exc:
+            yield filename, None, f'{type(exc).__name__}: {exc}'
+            continue
+        if result is None:
+            misses.append(filename)
+            continue
+        logger.info('Loaded %s from cache in %.3fs', filename, result[1])
+        yield filename, result[0], None
+
+    workers = min(INGEST_WORKERS if workers is None else workers, len(misses))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for filename, result in zip(misses, pool.map(_load_safe, misses)):
+                yield (filename, *_parsed(filename, result))
+    else:
+        for filename in misses:
+            yield (filename, *_parsed(filename, _load_safe(filename)))
+
+    seconds = time.perf_counter() - start
+    logger.info('Loaded %d workbooks in %.3fs (%d parsed, %d worker(s))',
+                len(filenames), seconds, len(misses), max(workers, 1))
+    observe_load('read_workbooks', seconds)
+
+
+def _parsed(filename, result):
+    if isinstance(result, str):
+        return None, result
+    product_df, seconds, _ = result
+    logger.info('Parsed %s in %.3fs', filename, seconds)
+    observe_load('parse_workbook', seconds)
+    return product_df, None
+
+####################### SCHEMA ###################################
+# The combined frame repeats every label string on each row and keeps 64-bit numbers.
+# Labels become categoricals, prices int32 (float32 when a platform has gaps),
+# discounts float32, dates datetime64, and the index a plain RangeIndex.
+
+def _memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+# int32 for a price or MRP column of whole numbers without gaps, float32 otherwise (so
+# a scraped 1299.5 is never truncated)
+def _price_dtype(values):
+    return 'int32' if values.notna().all() and (values % 1 == 0).all() else 'float32'
+
+
+def compact_products(df):
+    before = _memory_mb(df)
+    df = df.reset_index(drop=True)
+    df['Date'] = pd.to_datetime(df['Date'])
+
+    text_columns = df.select_dtypes(include=['object', 'string']).columns
+    for col in LABEL_COLUMNS + [c for c in text_columns if c not in LABEL_COLUMNS]:
+        df[col] = df[col].astype('category')
+
+    for col in PRICE_COLUMNS + MRP_COLUMNS:
+        df[col] = df[col].astype(_price_dtype(df[col]))
+    for col in DISCOUNT_COLUMNS:
+        df[col] = df[col].astype('float32')
+
+    logger.info('Product frame memory: %.2f MB -> %.2f MB', before, _memory_mb(df))
+    return df
+
+####################### CATALOG INDEX ############################
+# Type -> Company -> product names, in the order the products first appear in the data.
+# The dropdown option lists are built once here so the cascading dropdown callbacks
+# answer with a dictionary lookup instead of masking the whole frame.
+
+def build_catalog(df):
+    catalog = {}
+    rows = df[['Type', 'Company', 'Product Name']].dropna().drop_duplicates()
+    for ptype, company, product in rows.itertuples(index=False):
+        catalog.setdefault(ptype, {}).setdefault(company, []).append(product)
+    return catalog
+
+
+def _options(values):
+    return [{'label': v, 'value': v} for v in values]
+
+
+def build_catalog_options(catalog):
+    versions = {}
+    for companies in catalog.values():
+        for company, products in companies.items():
+            versions.setdefault(company, []).extend(products)
+    return {
+        'types': _options(catalog),
+        'companies': {ptype: _options(companies) for ptype, companies in catalog.items()},
+        'versions': {company: _options(products) for company, products in versions.items()},
+    }
+
+####################### LOAD DATASET #############################
+# Everything derived from the workbooks is published together as one immutable snapshot,
+# swapped in a single assignment, so a reader never mixes a new frame with an old catalog.
+_state = None  # {'products', 'database', 'catalog', 'options', 'version'}
+_workbooks = {}  # filename -> tagged frame of that workbook as last read, in manifest order
+                 # (not kept with SQLite storage, where the database holds the rows)
+_stamps = {}  # filename -> (mtime, size, Type, Company) of the workbook when it was last read
+_errors = {}  # filename -> why the workbook was skipped when it was last read
+_lock = threading.RLock()  # Serializes loading and reloading
+
+
+def _stamp(filename):
+    stat = os.stat(os.path.join(DATA_DIR, filename))
+    return stat.st_mtime, stat.st_size
+
+
+# Read discovered workbooks (file name, Type, Company) and tag each with its Type/Company.
+# A workbook that cannot be read or fails validation is logged and left out, and gets no
+# stamp, so the next check reads it again.
+def _read_tagged(workbooks):
+    info = {filename: (ptype, company) for filename, ptype, company in workbooks}
+    stamps = {filename: _stamp(filename) + info[filename] for filename in info}
+    tagged = {}
+    for filename, product_df, error in stream_workbooks(list(info)):
+        if error is not None:
+            logger.error('Skipping workbook %s: %s', filename, error)
+            inc('ecom_workbook_errors_total')
+            _errors[filename] = error
+            del stamps[filename]
+            continue
+        _errors.pop(filename, None)
+        product_df['Type'], product_df['Company'] = info[filename]
+        tagged[filename] = product_df
+    # stream_workbooks yields cache hits first; put the frames back in manifest order so
+    # the combined frame (and which duplicate row wins) does not depend on the cache
+    return {filename: tagged[filename] for filename in info if filename in tagged}, stamps
+
+
+# Combine the tagged workbooks (in the order of 'workbooks') into the shared frame.
+# Product lines scraped into more than one workbook keep the first workbook's row per day.
+def combine_workbooks(workbooks):
+    if not workbooks:
+        raise ValueError(f'No valid workbooks matched the catalog manifest {MANIFEST_PATH}')
+    df = pd.concat(list(workbooks.values()), ignore_index=True)
+    df = df.drop_duplicates(['Product Name', 'Date'], keep='first')
+
+    # Missing discounts mean the platform had no offer on that day
+    for col in DISCOUNT_COLUMNS:
+        df[col] = df[col].fillna(0)
+    return compact_products(df)
+
+
+# Discover every workbook, read it once, tag it with its Type/Company and combine them
+def load_products():
+    workbooks, _ = _read_tagged(discover_workbooks())
+    return combine_workbooks(workbooks)
+
+
+def _publish(workbooks, stamps):
+    global _state, _workbooks, _stamps
+    start = time.perf_counter()
+    products = combine_workbooks(workbooks)
+    catalog = build_catalog(products)
+    version = (_state['version'] if _state else 0) + 1
+    workbook_count = len(workbooks)  # Counted before SQLite storage drops the frames
+    database = None
+    if use_sqlite():
+        database = write_database(products, SQLITE_DIR)
+        workbooks, products = {}, None
+    _workbooks, _stamps = workbooks, stamps
+    _state = {
+        'products': products,
+        'database': database,
+        'catalog': catalog,
+        'options': build_catalog_options(catalog),
+        'version': version,
+    }
+    observe_load('publish', time.perf_counter() - start)
+    set_gauge('ecom_data_version', version)
+    set_gauge('ecom_workbooks', workbook_count)
+
+
+def _current():
+    if _state is None:
+        with _lock:
+            if _state is None:
+                _publish(*_read_tagged(discover_workbooks()))
+    return _state
+
+####################### HOT RELOAD ###############################
+# The scraper appends dated rows to the workbooks while the server runs. The manifest's
+# globs are matched again on every check: only new workbooks and those whose mtime/size
+# (or manifest entry) changed are read (through the Parquet cache), deleted ones are
+# dropped, and the data version is bumped so the figure cache and the dropdown index follow.
+
+# Seconds between checks of the data directory (0 disables the watcher)
+RELOAD_INTERVAL = float(os.environ.get('ECOM_RELOAD_INTERVAL', 60))
+
+_watcher = None
+
+
+# Re-read the workbooks that were added or changed since they were loaded; returns the
+# file names of the workbooks added, changed (and read successfully) or removed
+def reload_changed():
+    _current()
+    with _lock:
+        workbooks = discover_workbooks()
+        changed = []
+        for filename, ptype, company in workbooks:
+            try:
+                if _stamp(filename) + (ptype, company) != _stamps.get(filename):
+                    changed.append(filename)
+            except OSError:
+                continue  # Being replaced right now; picked up on the next check
+        names = [filename for filename, _, _ in workbooks]
+        removed = [filename for filename in _stamps if filename not in names]
+        if not changed and not removed:
+            return []
+
+        updated, stamps = _read_tagged([w for w in workbooks if w[0] in changed])
+        # A changed workbook that fails to read keeps its last good rows (and its old
+        # stamp, so it is retried on the next check); nothing is published until one reads
+        reloaded = [filename for filename in changed if filename in updated] + removed
+        if not reloaded:
+            return []
+        if use_sqlite():
+            # The workbook frames are not kept, so the others are read again (through
+            # the Parquet cache) to rebuild the database. A loaded workbook that cannot
+            # be read now has no last good rows to keep, so the database is left as it
+            # is (with the old stamps) until every loaded workbook reads again.
+            rest, rest_stamps = _read_tagged([w for w in workbooks if w[0] not in changed])
+            updated.update(rest)
+            stamps.update(rest_stamps)
+            unread = [filename for filename in names if filename in _stamps and filename not in updated]
+            if unread:
+                logger.warning('Not rebuilding the database while %s cannot be read', ', '.join(unread))
+                return []
+        tagged = {filename: updated.get(filename, _workbooks.get(filename)) for filename in names}
+        _publish({filename: df for filename, df in tagged.items() if df is not None},
+                 {filename: stamps.get(filename, _stamps.get(filename)) for filename in names
+                  if filename in stamps or filename in _stamps})
+        for filename in removed:
+            _errors.pop(filename, None)
+        logger.info('Reloaded %s (data version %d)', ', '.join(reloaded), _state['version'])
+        return reloaded
+
+
+def _watch(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            reload_changed()
+        except Exception:
+            # A workbook caught half-written fails to parse in _read_tagged instead and
+            # is retried on the next check; this is for anything else going wrong
+            logger.exception('Reloading workbooks failed')
+
+
+# Start the background thread polling the data directory for changed workbooks
+def start_watcher(interval=None):
+    global _watcher
+    interval = RELOAD_INTERVAL if interval is None else interval
+    if interval <= 0 or _watcher is not None:
+        return _watcher
+    _watcher = threading.Thread(target=_watch, args=(interval,), name='workbook-watcher', daemon=True)
+    _watcher.start()
+    return _watcher
+
+####################### ACCESSORS ################################
+# Return the shared DataFrame, loading it on the first call.
+# A shallow copy is handed out so a page adding or replacing columns never
+# changes the frame seen by the other pages (the data itself is not copied).
+# With SQLite storage the whole table is read from the database instead, which is
+# meant for batch jobs; the callbacks query only the rows they need.
+def get_products():
+    state = _current()
+    if state['products'] is None:
+        return read_table(state['database'])
+    return state['products'].copy(deep=False)
+
+
+# Path of the current SQLite database (None with in-memory storage)
+def get_database():
+    return _current()['database']
+
+
+# Version of the shared frame; caches derived from the data key on it
+def get_data_version():
+    return _current()['version']
+
+
+# Workbooks left out of the data (file name -> reason)
+def workbook_errors():
+    return dict(_errors)
+
+
+# Nested Type -> Company -> [product names] mapping
+def get_catalog():
+    return _current()['catalog']
+
+
+# Dropdown options for the product types
+def type_options():
+    return _current()['options']['types']
+
+
+# Dropdown options for the companies of a product type
+def company_options(selected_type):
+    return _current()['options']['companies'].get(selected_type, [])
+
+
+# Dropdown options for the product versions of a company
+def version_options(selected_company):
+    return _current()['options']['versions'].get(selected_company, [])
+
+
+# Value of a (multi-select) version dropdown as a list of at most MAX_COMPARE versions
+def selected_versions(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return list(dict.fromkeys(value))[:MAX_COMPARE]
+
+
+# Options of a multi-select version dropdown: the company's versions plus the versions
+# already selected (so other companies' models can stay in the comparison); once
+# MAX_COMPARE versions are selected the others are disabled
+def compare_version_options(selected_company, selected=None):
+    selected = selected_versions(selected)
+    options = [{'label': v, 'value': v} for v in selected]
+    options += [o for o in version_options(selected_company) if o['value'] not in selected]
+    if len(selected) >= MAX_COMPARE:
+        options = [o if o['value'] in selected else dict(o, disabled=True) for o in options]
+    return options
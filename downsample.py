@@ -0,0 +1,94 @@
+# Server-side downsampling of long price time series before they are sent to the browser.
+# Two methods are available: largest-triangle-three-buckets (LTTB), which keeps the visual
+# shape of the line, and min/max bucketing, which keeps every bucket's extremes. Both always
+# keep the first and last points and the series' overall minimum and maximum prices.
+import os
+
+import numpy as np
+
+####################### CONFIGURATION ###########################
+# Point budget per line chart (0 disables downsampling)
+MAX_POINTS = int(os.environ.get('ECOM_MAX_POINTS', 1000))
+
+# 'lttb' or 'minmax'
+METHOD = os.environ.get('ECOM_DOWNSAMPLE', 'lttb')
+
+####################### METHODS ##################################
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype('int64').astype('float64')
+    return x.astype('float64')
+
+
+# Indices of the points LTTB keeps out of (x, y); x must be sorted
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+
+    # Interior points are split into n_out - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of every bucket, used as the third triangle corner of the bucket before it
+    sums_x, sums_y = np.add.reduceat(x[:-1], edges[:-1]), np.add.reduceat(y[:-1], edges[:-1])
+    sizes = np.diff(edges)
+    means_x = np.append(sums_x / sizes, x[-1])
+    means_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        bx, by = x[start:stop], y[start:stop]
+        # Twice the triangle area between the previous pick, each candidate and the next bucket's mean
+        area = np.abs((x[prev] - means_x[i + 1]) * (by - y[prev]) - (x[prev] - bx) * (means_y[i + 1] - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+# Indices of each bucket's minimum and maximum (about n_out points in total)
+def minmax_indices(y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = _as_float(y)
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(np.append(edges, n)))
+
+    # Order by (bucket, value): a bucket's first and last entries are its min and max
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+
+
+# Indices to keep for one series, always including its overall min and max
+def downsample_indices(x, y, n_out, method=None):
+    y = _as_float(y)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) == 0 or n_out >= len(valid):
+        return valid
+    if (method or METHOD) == 'minmax':
+        keep = minmax_indices(y[valid], n_out)
+    else:
+        keep = lttb_indices(np.asarray(x)[valid], y[valid], n_out)
+    extremes = [np.argmin(y[valid]), np.argmax(y[valid])]
+    return valid[np.unique(np.concatenate([keep, extremes]))]
+
+
+# Downsample the rows of a date-sorted frame for a line chart of 'y_cols' against 'x_col'.
+# With several y columns the kept rows are the union of each column's picks, so the
+# lines still share their x values.
+def downsample_frame(df, x_col, y_cols, max_points=None):
+    max_points = MAX_POINTS if max_points is None else max_points
+    if not max_points or len(df) <= max_points:
+        return df
+    per_column = max(3, max_points // len(y_cols))
+    x = df[x_col].to_numpy()
+    keep = np.unique(np.concatenate([downsample_indices(x, df[col].to_numpy(), per_column) for col in y_cols]))
+    return df.iloc[keep]
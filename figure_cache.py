@@ -0,0 +1,69 @@
+# Bounded LRU cache of serialized Plotly figures for the chart callbacks.
+# The data is static between reloads, so a figure only depends on the page, the chart
+# kind, the selected product and the data version. Entries are stored as figure JSON
+# and dropped as soon as the data version changes.
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+try:  # orjson parses the cached figure JSON several times faster than json
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from data import get_data_version
+from metrics import inc, record_cache, set_gauge
+
+# Maximum number of figures kept in memory per process
+MAX_ENTRIES = int(os.environ.get('ECOM_FIGURE_CACHE_SIZE', 512))
+
+_entries = OrderedDict()  # (page, kind, product, version) -> figure JSON, oldest first
+_lock = threading.Lock()
+_version = None  # Data version the current entries were built from
+
+
+def _drop_stale(version):
+    global _version
+    if version != _version:
+        _entries.clear()
+        _version = version
+
+
+# Return the figures for 'kinds' of one product on one page.
+# 'build' is called only when one of them is missing and must return the figures
+# in the same order as 'kinds'. Cached figures come back as plain figure dicts.
+def cached_figures(page, product_name, kinds, build):
+    version = get_data_version()
+    keys = [(page, kind, product_name, version) for kind in kinds]
+
+    with _lock:
+        _drop_stale(version)
+        payloads = [_entries.get(key) for key in keys]
+        if all(payload is not None for payload in payloads):
+            for key in keys:
+                _entries.move_to_end(key)
+            record_cache(page, hits=len(keys))
+            return [json_loads(payload) for payload in payloads]
+    record_cache(page, misses=len(keys))
+
+    figures = list(build())
+    payloads = [pio.to_json(fig, validate=False) for fig in figures]
+
+    with _lock:
+        _drop_stale(version)
+        for key, payload in zip(keys, payloads):
+            _entries[key] = payload
+            _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            inc('ecom_figure_cache_evictions_total')
+        set_gauge('ecom_figure_cache_entries', len(_entries))
+    return figures
+
+
+# Drop every cached figure (e.g. after the workbooks were reloaded)
+def clear():
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,157 @@
+# Lightweight figure construction for the chart callbacks.
+# Plotly Express validates its arguments, melts wide-form frames and applies the template
+# on every call. The builders here assemble plain figure dicts straight from NumPy arrays
+# and share one prebuilt dark layout template; Dash accepts these dicts as 'figure' props.
+import numpy as np
+import plotly.io as pio
+
+# The 'plotly_dark' template, converted once and shared by every figure
+DARK_TEMPLATE = pio.templates['plotly_dark'].to_plotly_json()
+
+# Default trace colors of the template (px uses the first one for single-series charts)
+COLORWAY = DARK_TEMPLATE['layout']['colorway']
+
+####################### HELPERS ##################################
+
+# Trace values in a form orjson serializes natively: numbers stay a contiguous NumPy
+# array, dates become ISO strings (day precision when possible) and text a plain list.
+# Anything else would send plotly's encoder down its slow element-by-element path.
+def to_array(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        unit = 'D' if (values.astype('datetime64[D]') == values).all() else 's'
+        return np.datetime_as_string(values, unit=unit).tolist()
+    if values.dtype.kind in ('U', 'S', 'O'):
+        return values.tolist()
+    return np.ascontiguousarray(values)
+
+
+# Dark layout with a centered title and optional axis and legend titles
+def base_layout(title, x_title=None, y_title=None, legend_title=None, **extra):
+    layout = {
+        'template': DARK_TEMPLATE,
+        'title': {'text': title, 'x': 0.5},
+        'xaxis': {'title': {'text': x_title}},
+        'yaxis': {'title': {'text': y_title}},
+    }
+    if legend_title is not None:
+        layout['legend'] = {'title': {'text': legend_title}}
+    layout.update(extra)
+    return layout
+
+####################### CHARTS ###################################
+
+# Line chart with one trace per entry of 'series' (name -> y values) against shared x values
+def line_figure(x, series, title, x_title=None, y_title=None, color=None, legend_title=None):
+    x = to_array(x)
+    data = []
+    for name, y in series.items():
+        trace = {'type': 'scatter', 'mode': 'lines', 'name': name, 'x': x, 'y': to_array(y)}
+        if color is not None:
+            trace['line'] = {'color': color}
+        data.append(trace)
+    layout = base_layout(title, x_title, y_title, legend_title, showlegend=len(series) > 1)
+    return {'data': data, 'layout': layout}
+
+
+# Bar chart with one trace per entry of 'series', stacked like px.bar's wide form
+def bar_figure(x, series, title, x_title=None, y_title=None, legend_title=None, barmode='relative'):
+    x = to_array(x)
+    data = [{'type': 'bar', 'name': name, 'x': x, 'y': to_array(y)} for name, y in series.items()]
+    return {'data': data, 'layout': base_layout(title, x_title, y_title, legend_title, barmode=barmode)}
+
+
+# Histogram drawn from precomputed (counts, bin edges); 'hist' may be None for no data
+def histogram_figure(hist, title, x_title=None, y_title='count', color=None):
+    data = []
+    if hist is not None:
+        counts, edges = hist
+        trace = {'type': 'bar', 'x': (edges[:-1] + edges[1:]) / 2, 'y': counts, 'width': np.diff(edges)}
+        if color is not None:
+            trace['marker'] = {'color': color}
+        data.append(trace)
+    return {'data': data, 'layout': base_layout(title, x_title, y_title, bargap=0)}
+
+
+# One box per entry of 'values' (name -> raw values); plotly.js computes the quartiles
+def box_figure(values, title, x_title=None, y_title=None, points='outliers'):
+    data = [
+        {'type': 'box', 'name': name, 'y': to_array(y), 'boxpoints': points,
+         'marker': {'color': COLORWAY[0]}, 'showlegend': False}
+        for name, y in values.items()
+    ]
+    return {'data': data, 'layout': base_layout(title, x_title, y_title)}
+
+
+# Single box drawn from a precomputed five-number summary; 'summary' may be None
+def summary_box_figure(name, summary, title, y_title=None):
+    data = []
+    if summary is not None:
+        data.append({
+            'type': 'box', 'name': name,
+            **{key: [summary[key]] for key in ('q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean')},
+        })
+    return {'data': data, 'layout': base_layout(title, y_title=y_title)}
+
+
+# Line charts stacked in one column, one panel per entry of 'facets' (panel title ->
+# {name: (x, y)}), with shared x and y axes. A name keeps its color in every panel and
+# has one legend entry that toggles all of its lines.
+def faceted_line_figure(facets, title, x_title=None, y_title=None, legend_title=None, gap=0.08):
+    n = max(1, len(facets))
+    height = (1 - gap * (n - 1)) / n
+    colors = {}
+    data = []
+    layout = base_layout(title, legend_title=legend_title, height=120 + 260 * n, annotations=[])
+    for row, (facet, series) in enumerate(facets.items(), start=1):
+        suffix = '' if row == 1 else str(row)
+        top = 1 - (row - 1) * (height + gap)
+        layout[f'xaxis{suffix}'] = {'anchor': f'y{suffix}', 'showticklabels': row == n,
+                                    'title': {'text': x_title if row == n else None}}
+        layout[f'yaxis{suffix}'] = {'anchor': f'x{suffix}', 'domain': [top - height, top],
+                                    'title': {'text': y_title}}
+        if row > 1:
+            layout[f'xaxis{suffix}']['matches'] = 'x'
+            layout[f'yaxis{suffix}']['matches'] = 'y'
+        layout['annotations'].append({
+            'text': facet, 'showarrow': False, 'xref': 'paper', 'yref': 'paper',
+            'x': 0.5, 'y': top, 'xanchor': 'center', 'yanchor': 'bottom',
+        })
+        for name, (x, y) in series.items():
+            first = name not in colors
+            if first:
+                colors[name] = COLORWAY[len(colors) % len(COLORWAY)]
+            data.append({
+                'type': 'scatter', 'mode': 'lines', 'name': name, 'x': to_array(x), 'y': to_array(y),
+                'xaxis': f'x{suffix}', 'yaxis': f'y{suffix}', 'line': {'color': colors[name]},
+                'legendgroup': name, 'showlegend': first,
+            })
+    return {'data': data, 'layout': layout}
+
+
+# Boxes grouped by category: one trace per entry of 'groups' (name -> {category: raw values}),
+# drawn side by side within each category
+def grouped_box_figure(groups, title, x_title=None, y_title=None, legend_title=None, points='outliers'):
+    data = []
+    for i, (name, values) in enumerate(groups.items()):
+        x = [category for category, y in values.items() for _ in range(len(y))]
+        y = np.concatenate([np.asarray(y, dtype='float64') for y in values.values()]) if values else []
+        data.append({'type': 'box', 'name': name, 'x': x, 'y': to_array(y), 'boxpoints': points,
+                     'marker': {'color': COLORWAY[i % len(COLORWAY)]}, 'legendgroup': name})
+    return {'data': data, 'layout': base_layout(title, x_title, y_title, legend_title, boxmode='group')}
+
+
+# Dashed forecast line with a shaded interval band, drawn in 'color' on the given axes
+def forecast_traces(x, mean, lower, upper, name, color, axes=('x', 'y'), showlegend=True):
+    x = to_array(x)
+    red, green, blue = (int(color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4))
+    common = {'type': 'scatter', 'mode': 'lines', 'x': x, 'xaxis': axes[0], 'yaxis': axes[1],
+              'legendgroup': name, 'hoverinfo': 'skip'}
+    return [
+        dict(common, name=name, y=to_array(lower), line={'width': 0}, showlegend=False),
+        dict(common, name=name, y=to_array(upper), line={'width': 0}, showlegend=False,
+             fill='tonexty', fillcolor=f'rgba({red}, {green}, {blue}, 0.2)'),
+        {'type': 'scatter', 'mode': 'lines', 'name': name, 'x': x, 'y': to_array(mean),
+         'xaxis': axes[0], 'yaxis': axes[1], 'legendgroup': name, 'showlegend': showlegend,
+         'line': {'color': color, 'dash': 'dash'}},
+    ]
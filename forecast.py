@@ -0,0 +1,170 @@
+# Price forecasts for every product and platform.
+# Each price series gets a damped-trend exponential smoothing model (Holt's method). The
+# models are fitted in one batch: the series are laid out as rows of a day-by-day matrix
+# and the smoothing recursion runs over all of them (and a grid of smoothing parameters)
+# at once, keeping the parameters with the smallest one-step-ahead error per series.
+# Large catalogs are split into chunks fitted by a process pool. Forecasts are computed
+# once per data version, like the tables in product_stats, and the charts look them up.
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from data import get_data_version, PRICE_COLUMNS
+from metrics import observe_load
+from product_stats import iter_product_series
+
+logger = logging.getLogger(__name__)
+
+####################### CONFIGURATION ###########################
+# Days forecast after each product's last scraped day (0 disables forecasting)
+HORIZON = int(os.environ.get('ECOM_FORECAST_HORIZON', 14))
+
+# Days of history the models are fitted on
+HISTORY_DAYS = int(os.environ.get('ECOM_FORECAST_HISTORY', 365))
+
+# Fewest scraped prices a series needs to get a model
+MIN_POINTS = int(os.environ.get('ECOM_FORECAST_MIN_POINTS', 10))
+
+# Processes fitting the models (1 = fit in this process) and series per process
+WORKERS = int(os.environ.get('ECOM_FORECAST_WORKERS', os.cpu_count() or 1))
+CHUNK_SIZE = int(os.environ.get('ECOM_FORECAST_CHUNK', 2000))
+
+# Trend damping and the grid of level (alpha) and trend (beta) smoothing parameters
+DAMPING = 0.95
+ALPHAS = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+
+####################### FITTING ##################################
+
+# Fit every row of 'matrix' (series x days, NaN where a day has no price) over the whole
+# parameter grid. Returns each row's best (alpha, beta), final level and trend, and the
+# standard deviation of its one-step-ahead errors.
+def fit_matrix(matrix):
+    n, days = matrix.shape
+    alpha, beta = (g.ravel() for g in np.meshgrid(ALPHAS, BETAS, indexing='ij'))
+    level = np.zeros((n, len(alpha)))
+    trend = np.zeros((n, len(alpha)))
+    sse = np.zeros((n, len(alpha)))
+    count = np.zeros(n)
+    started = np.zeros(n, dtype=bool)
+
+    for t in range(days):
+        y = matrix[:, t]
+        valid = ~np.isnan(y)
+        # The first price of a series sets its level; the trend starts flat
+        first = valid & ~started
+        level[first] = y[first, None]
+        started |= first
+
+        step = started & ~first
+        predicted = level[step] + DAMPING * trend[step]
+        observed = valid[step]
+        y_step = np.where(observed, y[step], 0.0)[:, None]
+        # Days without a price just carry the forecast forward
+        new_level = np.where(observed[:, None], alpha * y_step + (1 - alpha) * predicted, predicted)
+        trend[step] = beta * (new_level - level[step]) + (1 - beta) * DAMPING * trend[step]
+        error = np.where(observed[:, None], y_step - predicted, 0.0)
+        sse[step] += error ** 2
+        count[step] += observed
+        level[step] = new_level
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n)
+    sigma = np.sqrt(sse[rows, best] / np.maximum(count, 1))
+    return alpha[best], beta[best], level[rows, best], trend[rows, best], sigma
+
+
+# Forecast 'horizon' days ahead from fitted states: (mean, lower, upper) of shape
+# (series, horizon), the band being a 95% interval that widens with the horizon
+def project(level, trend, sigma, horizon):
+    steps = np.arange(1, horizon + 1)
+    damped = np.cumsum(DAMPING ** steps)
+    mean = level[:, None] + trend[:, None] * damped
+    spread = 1.96 * sigma[:, None] * np.sqrt(steps)
+    return mean, mean - spread, mean + spread
+
+####################### BATCH ####################################
+
+# Lay the price series out as a (series x days) matrix aligned on each series' last day
+def series_matrix(series):
+    span = max(int((dates[-1] - dates[0]) / np.timedelta64(1, 'D')) + 1 for dates, _ in series)
+    days = max(1, min(HISTORY_DAYS, span))
+    matrix = np.full((len(series), days), np.nan)
+    for row, (dates, prices) in enumerate(series):
+        offset = ((dates[-1] - dates) / np.timedelta64(1, 'D')).astype(int)
+        keep = offset < days
+        matrix[row, days - 1 - offset[keep]] = prices[keep]
+    return matrix
+
+
+def _fit_chunk(series):
+    return fit_matrix(series_matrix(series))
+
+
+# Forecasts of every product and platform from (product, date-sorted series) pairs:
+# (product, price column) -> {'dates', 'mean', 'lower', 'upper', 'alpha', 'beta'}
+def build_forecasts(product_series, horizon=None, workers=None):
+    horizon = HORIZON if horizon is None else horizon
+    if horizon <= 0:
+        return {}
+
+    keys, series = [], []
+    for product, rows in product_series:
+        for col in PRICE_COLUMNS:
+            # A price of 0 means the product was not listed on that platform that day
+            valid = (rows[col] > 0).to_numpy()
+            if valid.sum() < MIN_POINTS:
+                continue
+            dates = rows['Date'].to_numpy()[valid].astype('datetime64[D]')
+            keys.append((product, col))
+            series.append((dates, rows[col].to_numpy(dtype='float64')[valid]))
+    if not series:
+        return {}
+
+    chunks = [series[i:i + CHUNK_SIZE] for i in range(0, len(series), CHUNK_SIZE)]
+    workers = min(WORKERS if workers is None else workers, len(chunks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fits = list(pool.map(_fit_chunk, chunks))
+    else:
+        fits = [_fit_chunk(chunk) for chunk in chunks]
+    alpha, beta, level, trend, sigma = (np.concatenate(parts) for parts in zip(*fits))
+
+    mean, lower, upper = project(level, trend, sigma, horizon)
+    steps = np.arange(1, horizon + 1).astype('timedelta64[D]')
+    forecasts = {}
+    for i, (key, (dates, _)) in enumerate(zip(keys, series)):
+        forecasts[key] = {
+            'dates': dates[-1] + steps,
+            'mean': mean[i].round(2), 'lower': lower[i].round(2), 'upper': upper[i].round(2),
+            'alpha': float(alpha[i]), 'beta': float(beta[i]),
+        }
+    return forecasts
+
+####################### LOOKUPS ##################################
+_forecasts = None  # Forecasts of the data version in _forecasts['version']
+_lock = threading.Lock()
+
+
+def get_forecasts():
+    global _forecasts
+    version = get_data_version()
+    if _forecasts is None or _forecasts['version'] != version:
+        with _lock:
+            if _forecasts is None or _forecasts['version'] != version:
+                start = time.perf_counter()
+                models = build_forecasts(iter_product_series())
+                seconds = time.perf_counter() - start
+                observe_load('forecast', seconds)
+                logger.info('Fitted %d price forecasts in %.3fs', len(models), seconds)
+                _forecasts = {'models': models, 'version': version}
+    return _forecasts['models']
+
+
+# Forecast of one product's prices on one platform, or None if it has no model
+def price_forecast(product_name, price_col):
+    return get_forecasts().get((product_name, price_col))
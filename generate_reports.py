@@ -0,0 +1,239 @@
+# Batch HTML reports: one self-contained page per product plus a catalog index.
+# The charts come from the same builders the dashboard pages use (price and discount
+# comparison, the platform charts) and the best-deal table. Products are rendered by a
+# process pool, and a product is skipped when its rows are unchanged since the last run
+# (a fingerprint of its data is kept in the output folder's manifest.json).
+#
+#   python generate_reports.py [--output Reports/catalog] [--workers 4] [--force]
+#                              [--plotlyjs inline|directory|cdn]
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs as _get_plotlyjs, get_plotlyjs_version
+
+logger = logging.getLogger('generate_reports')
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Bump when the report layout changes, so every report is rendered again
+REPORT_FORMAT = 2
+
+MANIFEST = 'manifest.json'
+
+####################### FINGERPRINTS #############################
+
+# File name of a product's report
+def report_filename(product_name):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', product_name).strip('-').lower()[:80]
+    digest = hashlib.sha1(product_name.encode()).hexdigest()[:8]
+    return f'{slug}-{digest}.html'
+
+
+# Hash of every product's rows (and the report format), in one pass over the frame
+def product_fingerprints(df):
+    row_hashes = pd.util.hash_pandas_object(df.drop(columns=['Product Name']), index=False)
+    fingerprints = {}
+    for product, hashes in row_hashes.groupby(df['Product Name'].to_numpy(), sort=False):
+        digest = hashlib.sha256(f'{REPORT_FORMAT}:'.encode())
+        digest.update(hashes.to_numpy().tobytes())
+        fingerprints[str(product)] = digest.hexdigest()
+    return fingerprints
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+####################### RENDERING ################################
+
+# plotly.js source (about 4.7 MB), read once per process
+@lru_cache(maxsize=1)
+def get_plotlyjs():
+    return _get_plotlyjs()
+
+
+def _page_modules():
+    # Importing the app registers the pages, whose figure builders the reports reuse
+    import app  # noqa: F401
+    return (sys.modules['pages.platform_analytics'], sys.modules['pages.price-comparison'],
+            sys.modules['pages.discount-comparison'])
+
+
+def _figure_html(fig):
+    return pio.to_html(fig, include_plotlyjs=False, full_html=False, validate=False)
+
+
+# Full HTML page; 'plotlyjs' says how the page gets plotly.js (None: it has no charts)
+def _page_html(title, body, plotlyjs=None):
+    if plotlyjs == 'inline':
+        script = f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    elif plotlyjs == 'directory':
+        script = '<script src="plotly.min.js"></script>'
+    elif plotlyjs == 'cdn':
+        # The plotly.js release this plotly.py version draws with (plotly-latest is frozen at 1.x)
+        script = f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+    else:
+        script = ''
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+{script}
+<style>
+body {{ background: #111; color: #eee; font-family: sans-serif; margin: 2em; }}
+a {{ color: #8ab4f8; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+th, td {{ border: 1px solid #444; padding: 4px 10px; text-align: center; }}
+.grid {{ display: flex; flex-wrap: wrap; justify-content: space-between; }}
+.grid > div {{ flex: 0 0 49%; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def _deal_table(records):
+    if not records:
+        return '<p>No platform lists this product.</p>'
+    columns = list(records[0])
+    head = ''.join(f'<th>{html.escape(c)}</th>' for c in columns)
+    rows = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(r[c]))}</td>' for c in columns) + '</tr>'
+                   for r in records)
+    return f'<table><tr>{head}</tr>{rows}</table>'
+
+
+# Render one product's report to 'path' (runs in the pool workers)
+def render_product(product, path, plotlyjs):
+    from best_deals import deal_records, latest_deals
+
+    platform, price, discount = _page_modules()
+    deals = latest_deals()
+    deal = deal_records(deals[deals['Product Name'] == product])
+
+    sections = [f'<h1>{html.escape(product)}</h1>', '<p><a href="index.html">Catalog</a></p>',
+                '<h2>Where is it cheapest right now?</h2>', _deal_table(deal)]
+
+    fig_line, fig_box = price.create_price_comparison(product)
+    sections += ['<h2>Price comparison</h2>', _figure_html(fig_line), _figure_html(fig_box)]
+
+    fig_discount_box, fig_discount_bar = discount.create_discount_comparison(product)
+    sections += ['<h2>Discount comparison</h2>', _figure_html(fig_discount_bar), _figure_html(fig_discount_box)]
+
+    for page in platform.PLATFORM_PAGES:
+        figures = platform.build_graphs(page, product)
+        sections.append(f"<h2>{html.escape(page['platform'])}</h2>")
+        sections.append('<div class="grid">' + ''.join(f'<div>{_figure_html(fig)}</div>' for fig in figures) + '</div>')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(_page_html(product, '\n'.join(sections), plotlyjs))
+    return product
+
+
+def render_index(out_dir, manifest):
+    from best_deals import deal_records, latest_deals
+    from data import get_catalog
+
+    deals = {r['Product Name']: r for r in deal_records(latest_deals())}
+    sections = ['<h1>Product Price Reports</h1>',
+                f"<p>Generated {time.strftime('%d-%m-%Y %H:%M')}</p>"]
+    for ptype, companies in get_catalog().items():
+        sections.append(f'<h2>{html.escape(ptype)}</h2>')
+        for company, products in companies.items():
+            sections.append(f'<h3>{html.escape(company)}</h3>')
+            rows = []
+            for product in products:
+                deal = deals.get(product, {})
+                link = f'<a href="{manifest[product]["file"]}">{html.escape(product)}</a>'
+                rows.append(f"<tr><td>{link}</td><td>{deal.get('Best Platform', '')}</td>"
+                            f"<td>{deal.get('Best Price', '')}</td><td>{deal.get('Spread (%)', '')}</td></tr>")
+            sections.append('<table><tr><th>Product</th><th>Cheapest on</th><th>Price</th>'
+                            '<th>Spread (%)</th></tr>' + ''.join(rows) + '</table>')
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(_page_html('Product Price Reports', '\n'.join(sections)))
+
+####################### BATCH ####################################
+
+def generate(out_dir, workers, force=False, plotlyjs='inline'):
+    from best_deals import get_deals
+    from data import get_products
+    from forecast import get_forecasts
+    from product_stats import get_stats
+    from storage import use_sqlite
+
+    start = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    fingerprints = product_fingerprints(get_products())
+    old = {} if force else read_manifest(out_dir)
+
+    manifest, todo = {}, []
+    for product, fingerprint in fingerprints.items():
+        filename = report_filename(product)
+        manifest[product] = {'file': filename, 'fingerprint': fingerprint}
+        entry = old.get(product)
+        if (entry and entry.get('fingerprint') == fingerprint and entry.get('file') == filename
+                and os.path.exists(os.path.join(out_dir, filename))):
+            continue
+        todo.append(product)
+
+    if plotlyjs == 'directory':
+        with open(os.path.join(out_dir, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+
+    # Load the pages and the derived tables once here, so forked workers inherit them
+    if todo:
+        _page_modules()
+        if not use_sqlite():
+            get_stats()
+        get_deals()
+        get_forecasts()
+    paths = [os.path.join(out_dir, manifest[product]['file']) for product in todo]
+    workers = max(1, min(workers, len(todo)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_product, todo, paths, [plotlyjs] * len(todo)))
+    else:
+        for product, path in zip(todo, paths):
+            render_product(product, path, plotlyjs)
+
+    render_index(out_dir, manifest)
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info('%d reports rendered, %d unchanged, in %.2fs (%d worker(s))',
+                len(todo), len(fingerprints) - len(todo), time.perf_counter() - start, workers)
+    return todo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render an HTML price report for every product')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'Reports', 'catalog'), help='output folder')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='rendering processes')
+    parser.add_argument('--force', action='store_true', help='render unchanged products too')
+    parser.add_argument('--plotlyjs', choices=['inline', 'directory', 'cdn'], default='inline',
+                        help='embed plotly.js in every report, share one copy, or load it from the CDN')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    generate(args.output, args.workers, args.force, args.plotlyjs)
+
+
+if __name__ == '__main__':
+    main()
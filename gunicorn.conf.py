@@ -0,0 +1,34 @@
+# Gunicorn settings for serving the dashboard in production:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server
+#
+# Every setting can be overridden with an environment variable.
+import os
+
+# Address to listen on
+bind = os.environ.get('ECOM_BIND', '0.0.0.0:8050')
+
+# Worker processes and request threads per worker
+workers = int(os.environ.get('ECOM_WORKERS', min(os.cpu_count() or 1, 4) * 2))
+threads = int(os.environ.get('ECOM_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Import wsgi.py (load the data, warm the caches) in the master before forking,
+# so the workers share the loaded data copy-on-write
+preload_app = True
+
+# First-time figure builds for a large catalog can take a while
+timeout = int(os.environ.get('ECOM_TIMEOUT', 60))
+
+accesslog = os.environ.get('ECOM_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('ECOM_LOG_LEVEL', 'info')
+
+
+# Threads do not survive fork, so each worker starts its own workbook watcher
+# (and its own warm-up when the master did not preload the data)
+def post_fork(server, worker):
+    from data import start_watcher
+    from warmup import start_warm_up
+    start_watcher()
+    start_warm_up()
@@ -0,0 +1,178 @@
+# Request instrumentation for the dashboard server.
+# Records a latency histogram and the response bytes of every Dash callback, figure
+# cache hits and misses per page and the duration of each data-load stage. Every response
+# gets a Server-Timing header, and /metrics serves all values in the Prometheus text
+# format. Values are per process: with several Gunicorn workers, scrape each one.
+import os
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, abort, g, request
+
+####################### CONFIGURATION ###########################
+# Addresses allowed to read /metrics ('*' allows everyone)
+METRICS_ALLOW = [a.strip() for a in os.environ.get('ECOM_METRICS_ALLOW', '127.0.0.1,::1').split(',') if a.strip()]
+
+# Upper bounds (seconds) of the callback latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Name, type and help text of every metric, in the order they are rendered
+METRICS = {
+    'ecom_callback_duration_seconds': ('histogram', 'Time spent in a Dash callback request'),
+    'ecom_callback_response_bytes_total': ('counter', 'Bytes sent for a Dash callback (after compression)'),
+    'ecom_figure_cache_hits_total': ('counter', 'Figures served from the figure cache'),
+    'ecom_figure_cache_misses_total': ('counter', 'Figures that had to be built'),
+    'ecom_figure_cache_evictions_total': ('counter', 'Figures dropped from the full figure cache'),
+    'ecom_figure_cache_entries': ('gauge', 'Figures currently in the figure cache'),
+    'ecom_compression_input_bytes_total': ('counter', 'Response bytes before compression'),
+    'ecom_compression_output_bytes_total': ('counter', 'Response bytes after compression'),
+    'ecom_data_load_seconds': ('summary', 'Duration of a data-load stage'),
+    'ecom_data_load_last_seconds': ('gauge', 'Duration of the latest run of a data-load stage'),
+    'ecom_data_version': ('gauge', 'Version of the shared product frame'),
+    'ecom_workbooks': ('gauge', 'Workbooks in the shared product frame'),
+    'ecom_workbook_errors_total': ('counter', 'Workbooks left out because they failed to load or validate'),
+    'ecom_sqlite_bytes': ('gauge', 'Size of the SQLite product database (ECOM_STORAGE=sqlite)'),
+}
+
+####################### REGISTRY #################################
+_lock = threading.Lock()
+_values = defaultdict(float)  # (name, labels) -> counter or gauge value
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_summaries = defaultdict(lambda: [0.0, 0])  # (name, labels) -> [sum, count]
+_local = threading.local()  # Server-Timing entries of the request handled by this thread
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    with _lock:
+        _values[_key(name, labels)] += amount
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _values[_key(name, labels)] = value
+
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.setdefault(key, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+# Note a timing for the Server-Timing header of the current request (if any);
+# 'seconds' may be None for a description-only entry
+def server_timing(name, seconds, description=None):
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings.append((name, seconds, description))
+
+
+# Record one run of a data-load stage ('read_workbooks', 'publish', 'product_stats', ...)
+def observe_load(stage, seconds):
+    with _lock:
+        summary = _summaries[_key('ecom_data_load_seconds', {'stage': stage})]
+        summary[0] += seconds
+        summary[1] += 1
+    set_gauge('ecom_data_load_last_seconds', seconds, stage=stage)
+    server_timing(f'load-{stage}', seconds)
+
+
+# Count figure cache lookups of one page
+def record_cache(page, hits=0, misses=0):
+    if hits:
+        inc('ecom_figure_cache_hits_total', hits, page=page)
+    if misses:
+        inc('ecom_figure_cache_misses_total', misses, page=page)
+    server_timing('figure-cache', None, 'hit' if not misses else 'miss')
+
+####################### TEXT FORMAT ##############################
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _series(name, labels, value, extra=()):
+    labels = tuple(labels) + tuple(extra)
+    if labels:
+        name += '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+    return f'{name} {value:.17g}'
+
+
+# All metrics in the Prometheus text exposition format
+def render():
+    lines = []
+    with _lock:
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'histogram':
+                for (metric, labels), hist in sorted(_histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(LATENCY_BUCKETS, hist):
+                        lines.append(_series(f'{name}_bucket', labels, count, [('le', f'{bound:g}')]))
+                    lines.append(_series(f'{name}_bucket', labels, hist[-1], [('le', '+Inf')]))
+                    lines.append(_series(f'{name}_sum', labels, hist[-2]))
+                    lines.append(_series(f'{name}_count', labels, hist[-1]))
+            elif kind == 'summary':
+                for (metric, labels), (total, count) in sorted(_summaries.items()):
+                    if metric == name:
+                        lines.append(_series(f'{name}_sum', labels, total))
+                        lines.append(_series(f'{name}_count', labels, count))
+            else:
+                for (metric, labels), value in sorted(_values.items()):
+                    if metric == name:
+                        lines.append(_series(name, labels, value))
+    return '\n'.join(lines) + '\n'
+
+####################### FLASK HOOKS ##############################
+
+def _start_request():
+    g.metrics_start = time.perf_counter()
+    _local.timings = []
+
+
+def _finish_request(response):
+    timings, _local.timings = getattr(_local, 'timings', None) or [], None
+    start = getattr(g, 'metrics_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+
+    # Dash posts every callback to this route; its 'output' field identifies the callback
+    if request.path.endswith('/_dash-update-component'):
+        body = request.get_json(silent=True) or {}
+        callback_id = body.get('output', 'unknown')
+        observe('ecom_callback_duration_seconds', elapsed, callback=callback_id)
+        if not response.direct_passthrough:
+            inc('ecom_callback_response_bytes_total', len(response.get_data()), callback=callback_id)
+
+    entries = []
+    for name, seconds, desc in timings:
+        entry = name if seconds is None else f'{name};dur={seconds * 1000:.1f}'
+        entries.append(entry + (f';desc="{desc}"' if desc else ''))
+    entries.append(f'total;dur={elapsed * 1000:.1f}')
+    response.headers.add('Server-Timing', ', '.join(entries))
+    return response
+
+
+def _metrics_view():
+    if '*' not in METRICS_ALLOW and request.remote_addr not in METRICS_ALLOW:
+        abort(403)
+    return Response(render(), mimetype='text/plain; version=0.0.4')
+
+
+# Install the timing hooks and the /metrics route on the Flask server
+def init_app(server):
+    server.before_request(_start_request)
+    server.after_request(_finish_request)
+    server.add_url_rule('/metrics', 'metrics', _metrics_view)
@@ -0,0 +1,79 @@
+import dash
+from dash import dcc, html, callback, dash_table
+from dash.dependencies import Input, Output
+from data import type_options, company_options
+from best_deals import latest_deals, deal_records, DEAL_COLUMNS
+from figures import bar_figure
+
+# Registering the page in Dash with custom settings for URL, name, and order
+dash.register_page(__name__, path='/best-deals', name="Best Deals 🏷️", order=8)
+
+# Number of products in the chart of the biggest price gaps
+CHART_PRODUCTS = 15
+
+####################### BEST DEALS ###############################
+# Grouped bars of the cheapest and the highest current price of the top products
+def create_deals_chart(deals):
+    top = deals.head(CHART_PRODUCTS)
+    return bar_figure(
+        top['Product Name'].astype(str),
+        {'Best Price': top['Best Price'], 'Highest Price': top['Highest Price']},
+        title='Biggest Price Gaps Between Platforms',
+        x_title='Product',
+        y_title='Price (in Indian Rupees)',
+        legend_title='Price',
+        barmode='group',
+    )
+
+####################### WIDGETS ################################
+# 'Type' dropdown, filled from the catalog (empty means every type)
+type_dd = dcc.Dropdown(id='type-dropdown-deals', placeholder='All types')
+company_dd = dcc.Dropdown(id='company-dropdown-deals', placeholder='All companies')
+
+####################### PAGE LAYOUT #############################
+layout = html.Div([
+    html.H1("Where Is It Cheapest Right Now?", style={'textAlign': 'center'}),
+
+    html.P("Select Type:"),
+    type_dd,  # Type Dropdown
+
+    html.P("Select Company:"),
+    company_dd,  # Company Dropdown
+
+    # Chart of the largest gaps and the ranked table of the latest prices
+    dcc.Loading(dcc.Graph(id='deals-graph', style={'width': '100%'})),
+    dash_table.DataTable(
+        id='deals-table',
+        columns=[{'name': c, 'id': c} for c in DEAL_COLUMNS],
+        page_size=10,
+        sort_action='native',
+        style_table={'width': '100%', 'overflowX': 'auto'},
+        style_data={'height': 'auto', 'textAlign': 'center'}
+    ),
+], className="p-4 m-2")
+
+####################### CALLBACKS ################################
+# Callback to fill the type dropdown with the product types of the catalog
+@callback(
+    Output('type-dropdown-deals', 'options'),
+    Input('type-dropdown-deals', 'id')
+)
+def update_type_dropdown(_):
+    return type_options()
+
+# Callback to update the company dropdown based on the selected type
+@callback(
+    Output('company-dropdown-deals', 'options'),
+    Input('type-dropdown-deals', 'value')
+)
+def update_company_dropdown(selected_type):
+    return company_options(selected_type)
+
+# Callback to update the chart and table for the selected type and company
+@callback(
+    [Output('deals-graph', 'figure'), Output('deals-table', 'data')],
+    [Input('type-dropdown-deals', 'value'), Input('company-dropdown-deals', 'value')]
+)
+def update_deals(selected_type, selected_company):
+    deals = latest_deals(selected_type, selected_company)
+    return create_deals_chart(deals), deal_records(deals)
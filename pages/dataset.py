@@ -1,41 +1,153 @@
 # Import necessary libraries for data handling, Dash components, and visualization
+import re
+
 import pandas as pd
 import dash
-from dash import html, dash_table, dcc
-import plotly.graph_objects as go
+from dash import dcc, html, dash_table, callback
+from dash.dependencies import Input, Output
+from data import get_database, get_products, DISCOUNT_COLUMNS
+from storage import TABLE, column_types, count_rows, quote, read_query, use_sqlite
 
 # Register this file as a page in the Dash app with the path '/dataset' and name "Dataset 📋"
 dash.register_page(__name__, path='/dataset', name="Dataset 📋", order=2)
 
 ####################### LOAD DATASET #############################
 
-# Load individual Excel files containing product data
-df_vivo = pd.read_excel('analysispart3/vivo.xlsx')
-df_motorola = pd.read_excel('analysispart3/moto.xlsx')
-df_redmi = pd.read_excel('analysispart3/redmi.xlsx')
-df_iphone13 = pd.read_excel('analysispart3/iphone13.xlsx')
-df_iphone14 = pd.read_excel('analysispart3/iphone14.xlsx')
-df_iphone15 = pd.read_excel('analysispart3/iphone15.xlsx')
-df_redmi_buds = pd.read_excel('analysispart3/redmi_buds.xlsx') 
-df_realme_buds = pd.read_excel('analysispart3/realme_buds.xlsx') 
-df_boat_watch = pd.read_excel('analysispart3/boat_watch.xlsx')
-
-# Combine all individual dataframes into a single dataframe for display
-df = pd.concat([df_vivo, df_motorola, df_redmi, df_iphone13, df_iphone14, df_iphone15, df_redmi_buds, df_realme_buds, df_boat_watch])
-
-# Convert 'Date' column to datetime format and then reformat as 'dd-mm-yyyy'
-df['Date'] = pd.to_datetime(df['Date'])
-df['Date'] = df['Date'].dt.strftime('%d-%m-%Y')
-
-# Handle missing values in the 'Discount On Jiomart' column by filling them with 0
-df['Discount On Jiomart'] = df['Discount On Jiomart'].fillna(0)
-df['Discount On Amazon'] = df['Discount On Amazon'].fillna(0)
-df['Discount On Flipkart'] = df['Discount On Flipkart'].fillna(0)
-
-# Format the discount columns as strings with a '%' symbol
-df['Discount On Amazon'] = (df['Discount On Amazon'].astype(int).astype(str) + '%')
-df['Discount On Jiomart'] = (df['Discount On Jiomart'].astype(int).astype(str) + '%')
-df['Discount On Flipkart'] = (df['Discount On Flipkart'].astype(int).astype(str) + '%')
+# Shared product data (missing discounts are already filled with 0), loaded on first use.
+# Rows are paged, sorted and filtered on the server, so only the visible page is sent.
+PAGE_SIZE = 10
+
+####################### FILTERING ###############################
+# DataTable filter expressions look like "{Price On Amazon} > 1000 && {Company} contains boAt".
+# The column comes first, then the operator right after it, so a value such as "Edge 50"
+# (which holds 'ge ') is never split on an operator inside it.
+FILTER_PART = re.compile(r'^\{(.+?)\}\s+(s?[<>]=?|s?!?=|ge|le|lt|gt|ne|eq|contains|datestartswith)\s+(.*)$')
+OPERATORS = {'>=': 'ge', '<=': 'le', '<': 'lt', '>': 'gt', '!=': 'ne', '=': 'eq'}
+TEXT_OPERATORS = ('contains', 'datestartswith')
+
+
+# Split one filter expression into (column, operator, value); the value is the raw text
+# with any quotes removed. (None, None, None) if it is not a filter expression.
+def split_filter_part(filter_part):
+    match = FILTER_PART.match(filter_part.strip())
+    if match is None:
+        return None, None, None
+    name, operator, value = match.groups()
+    operator = OPERATORS.get(operator.lstrip('s'), operator)
+    value = value.strip()
+    if len(value) > 1 and value[0] == value[-1] and value[0] in ("'", '"', '`'):
+        value = value[1:-1].replace('\\' + value[0], value[0])
+    return name, operator, value
+
+
+def _is_number(value):
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+# The filter expressions that apply to columns of the given dtypes (column -> dtype name),
+# as (column, operator, value) with the value parsed for the column: text for the text
+# operators, a timestamp for dates and a float for numbers. Parts naming an unknown
+# column or whose value does not parse for it are skipped rather than failing the callback.
+def filter_conditions(filter_query, types):
+    conditions = []
+    for filter_part in (filter_query or '').split(' && '):
+        col_name, operator, value = split_filter_part(filter_part)
+        if col_name not in types:
+            continue
+        if operator not in TEXT_OPERATORS:
+            try:
+                if col_name == 'Date':
+                    value = pd.to_datetime(value, dayfirst=True)
+                elif types[col_name].startswith(('int', 'float')):
+                    value = float(value)
+                elif operator in ('lt', 'le', 'gt', 'ge') and _is_number(value):
+                    continue  # A number compared with text: the wrong type for the column
+            except (ValueError, TypeError, OverflowError):
+                continue
+            if value is pd.NaT:
+                continue
+        conditions.append((col_name, operator, value))
+    return conditions
+
+
+# Apply the table's filter query to the DataFrame
+def filter_rows(df, filter_query):
+    types = df.dtypes.astype(str).to_dict()
+    for col_name, operator, value in filter_conditions(filter_query, types):
+        col = df[col_name]
+        if operator in TEXT_OPERATORS:
+            # Match against the text shown in the table
+            text = col.dt.strftime('%d-%m-%Y') if col_name == 'Date' else col.astype(str)
+            if operator == 'contains':
+                df = df.loc[text.str.contains(value, case=False, regex=False)]
+            else:
+                df = df.loc[text.str.startswith(value)]
+            continue
+
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            col = col.astype(str)
+        df = df.loc[getattr(col, operator)(value)]
+    return df
+
+
+# The same filter as an SQL WHERE clause and its parameters (for SQLite storage)
+def filter_sql(filter_query, types):
+    clauses, params = [], []
+    for col_name, operator, value in filter_conditions(filter_query, types):
+        col = quote(col_name)
+        if operator in TEXT_OPERATORS:
+            # Match against the text shown in the table
+            if col_name == 'Date':
+                text = f"strftime('%d-%m-%Y', {col})"
+            elif types[col_name].startswith(('int', 'float')):
+                text = f'CAST({col} AS TEXT)'
+            else:
+                text = col
+            if operator == 'contains':
+                # LIKE ignores case (ASCII, as SQLite's lower() does) and skips the lower() calls
+                escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                clauses.append(f"{text} LIKE ? ESCAPE '\\'")
+                params.append(f'%{escaped}%')
+            else:
+                clauses.append(f'substr({text}, 1, ?) = ?')
+                params += [len(value), value]
+            continue
+
+        if col_name == 'Date':
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        if operator == 'ne':
+            clauses.append(f'({col} != ? OR {col} IS NULL)')
+        else:
+            sql_operator = {'eq': '=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}[operator]
+            clauses.append(f'{col} {sql_operator} ?')
+        params.append(value)
+    return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+# One page of the filtered and sorted rows from the SQLite database, the number of
+# matching rows and the column names
+def query_page(page_current, page_size, sort_by, filter_query):
+    database = get_database()
+    types = column_types(database)
+    where, params = filter_sql(filter_query, types)
+    order = [f"{quote(s['column_id'])} {'ASC' if s['direction'] == 'asc' else 'DESC'} NULLS LAST"
+             for s in sort_by or [] if s['column_id'] in types]
+    page_df = read_query(database, f"SELECT * FROM {TABLE} {where} ORDER BY {', '.join(order + ['rowid'])} "
+                                   f"LIMIT ? OFFSET ?", params + [page_size, page_current * page_size])
+    return page_df, count_rows(database, where, params), list(types)
+
+
+# Format the visible rows for display: 'dd-mm-yyyy' dates and whole-number discounts with '%'
+def format_page(page_df):
+    page_df = page_df.copy()
+    page_df['Date'] = page_df['Date'].dt.strftime('%d-%m-%Y')
+    for col in DISCOUNT_COLUMNS:
+        page_df[col] = page_df[col].astype(int).astype(str) + '%'
+    return page_df
 
 ####################### PAGE LAYOUT #############################
 
@@ -43,14 +155,22 @@ df['Discount On Flipkart'] = (df['Discount On Flipkart'].astype(int).astype(str)
 layout = html.Div(children=[
     # Page title
     html.H1("Dataset Preview", style={'textAlign': 'center'}, className='app-header'),
-    
+
     # Line break for spacing
     html.Br(),
-    
+
     # Data table to display the dataset, with pagination set to 10 rows per page
-    dash_table.DataTable(
-        data=df.to_dict('records'),  # Convert dataframe to dictionary format for Dash DataTable
-        page_size=10,  # Show 10 rows per page
+    # (its columns arrive with the first page, once the data is loaded)
+    dcc.Loading(dash_table.DataTable(
+        id='dataset-table',
+        page_current=0,
+        page_size=PAGE_SIZE,  # Show 10 rows per page
+        page_action='custom',  # Paging, sorting and filtering happen in update_table
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
         style_table={
             'height': '400px',  # Set table height
             'width': '100%',    # Set table width
@@ -60,5 +180,39 @@ layout = html.Div(children=[
             'height': 'auto',  # Auto-adjust row height
             'textAlign': 'center'  # Center-align text in cells
         }
-    ),
+    )),
 ], className="bg-dark text-dark p-4 m-2")  # Apply background, text color, padding, and margin styling
+
+####################### CALLBACKS ################################
+# Send only the requested page of the filtered and sorted data to the browser
+@callback(
+    [Output('dataset-table', 'data'), Output('dataset-table', 'page_count'), Output('dataset-table', 'columns')],
+    [Input('dataset-table', 'page_current'),
+     Input('dataset-table', 'page_size'),
+     Input('dataset-table', 'sort_by'),
+     Input('dataset-table', 'filter_query')]
+)
+def update_table(page_current, page_size, sort_by, filter_query):
+    page_current = page_current or 0
+    page_size = page_size or PAGE_SIZE
+    if use_sqlite():
+        page_df, total, names = query_page(page_current, page_size, sort_by, filter_query)
+        page_count = max(1, -(-total // page_size))
+        columns = [{'name': c, 'id': c} for c in names]
+        return format_page(page_df).to_dict('records'), page_count, columns
+
+    df = filter_rows(get_products(), filter_query)
+
+    # Sorting on a column the table does not have is ignored, as in query_page
+    sort_by = [s for s in sort_by or [] if s['column_id'] in df.columns]
+    if sort_by:
+        df = df.sort_values(
+            [s['column_id'] for s in sort_by],
+            ascending=[s['direction'] == 'asc' for s in sort_by],
+            kind='stable',  # Ties keep the row order, as the SQLite path does
+        )
+
+    page_df = df.iloc[page_current * page_size:(page_current + 1) * page_size]
+    page_count = max(1, -(-len(df) // page_size))  # Ceiling division
+    columns = [{'name': c, 'id': c} for c in df.columns]
+    return format_page(page_df).to_dict('records'), page_count, columns
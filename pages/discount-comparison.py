@@ -1,120 +1,86 @@
 # Import required libraries
-import pandas as pd
 import dash
 from dash import dcc, html, callback
-import plotly.express as px
 from dash.dependencies import Input, Output
+from data import type_options, company_options, compare_version_options, selected_versions, DISCOUNT_COLUMNS
+from figures import bar_figure, box_figure, grouped_box_figure
+from figure_cache import cached_figures
+from product_stats import date_picker_range, product_series, products_series
 
 # Register the page in the Dash app with a specific route and name
 dash.register_page(__name__, path='/discount-comparison', name="Discount Comparison 💸", order=4)
 
-####################### LOAD DATASET #############################
-# Load each product's data from Excel files into separate DataFrames
-df_vivo = pd.read_excel('analysispart3/vivo.xlsx')
-df_motorola = pd.read_excel('analysispart3/moto.xlsx')
-df_redmi = pd.read_excel('analysispart3/redmi.xlsx')
-df_iphone13 = pd.read_excel('analysispart3/iphone13.xlsx')
-df_iphone14 = pd.read_excel('analysispart3/iphone14.xlsx')
-df_iphone15 = pd.read_excel('analysispart3/iphone15.xlsx')
-df_boat = pd.read_excel('analysispart3/boat.xlsx')  
-df_redmi_buds = pd.read_excel('analysispart3/redmi_buds.xlsx') 
-df_realme_buds = pd.read_excel('analysispart3/realme_buds.xlsx') 
-df_boat_watch = pd.read_excel('analysispart3/boat_watch.xlsx')
-
-# Add 'Type' and 'Company' columns to each DataFrame for categorization
-df_vivo['Type'] = 'Mobile'
-df_vivo['Company'] = 'Vivo'
-
-df_motorola['Type'] = 'Mobile'
-df_motorola['Company'] = 'Motorola'
-
-df_redmi['Type'] = 'Mobile'
-df_redmi['Company'] = 'Redmi'
-
-df_iphone13['Type'] = 'Mobile'
-df_iphone13['Company'] = 'iPhone'
-
-df_iphone14['Type'] = 'Mobile'
-df_iphone14['Company'] = 'iPhone'
-
-df_iphone15['Type'] = 'Mobile'
-df_iphone15['Company'] = 'iPhone'
-
-df_boat['Type'] = 'Headphones'  
-df_boat['Company'] = 'boAt'
-
-df_redmi_buds['Type'] = 'Headphones'
-df_redmi_buds['Company'] = 'Redmi Buds'
-
-df_realme_buds['Type'] = 'Headphones'
-df_realme_buds['Company'] = 'Realme Buds'
-
-df_boat_watch['Type'] = 'Watch'
-df_boat_watch['Company'] = 'boAt Watch'
-
-# Combine all DataFrames into a single DataFrame
-df = pd.concat([df_vivo, df_motorola, df_redmi, df_iphone13, df_iphone14, df_iphone15, 
-                df_boat, df_redmi_buds, df_realme_buds, df_boat_watch])
-
-# Fill missing values in the 'Discount On Jiomart' column with 0
-df['Discount On Jiomart'] = df['Discount On Jiomart'].fillna(0)
-df['Discount On Amazon'] = df['Discount On Amazon'].fillna(0)
-df['Discount On Flipkart'] = df['Discount On Flipkart'].fillna(0)
-
 ####################### DISCOUNT COMPARISON ######################
-# Function to create figures for discount comparison for a specific product version
-def create_discount_comparison(selected_version):
-    # Filter the DataFrame to only include data for the selected version
-    filtered_df = df[df['Product Name'] == selected_version]
+# Function to create figures for discount comparison for the selected product version(s)
+# (optionally limited to a date range)
+def create_discount_comparison(selected_version, start_date=None, end_date=None):
+    products = selected_versions(selected_version)
+    if len(products) > 1:
+        return create_multi_discount_comparison(products, start_date, end_date)
+    selected_version = products[0] if products else None
+
+    # Date-sorted rows of the selected version, sliced to the date range
+    filtered_df = product_series(selected_version, start_date, end_date)
 
     # Create a bar chart for discount comparison over time across platforms
-    fig_bar = px.bar(
-        data_frame=filtered_df,
-        x='Date',
-        y=['Discount On Amazon', 'Discount On Flipkart', 'Discount On Jiomart'],
-        title=f'Discount Comparison for {selected_version}'
+    fig_bar = bar_figure(
+        filtered_df['Date'],
+        {col: filtered_df[col] for col in DISCOUNT_COLUMNS},
+        title=f'Discount Distribution for {selected_version}',
+        x_title='Date',
+        y_title='value',
+        legend_title='variable',
     )
 
-    # Create a box plot to show discount distribution across platforms
-    fig_box = px.box(
-        data_frame=filtered_df,
-        y=['Discount On Amazon', 'Discount On Flipkart', 'Discount On Jiomart'],
-        title=f'Discount Distribution for {selected_version}',
-        points='outliers'  # Show outliers
+    # Create a box plot to show discount distribution across platforms (outliers shown)
+    fig_box = box_figure(
+        {col: filtered_df[col] for col in DISCOUNT_COLUMNS},
+        title=f'Discount Comparison for {selected_version}',
+        x_title="Platform Names",
+        y_title="Discount (%)",
     )
 
-    # Apply a dark theme and center the title in both charts
-    fig_bar.update_layout(
-        title_text=f'Discount Distribution for {selected_version}',
-        title_x=0.5,
-        template='plotly_dark',
+    return fig_box, fig_bar  # Return both figures for display
+
+# Function to compare the discounts of several product versions side by side
+def create_multi_discount_comparison(products, start_date=None, end_date=None):
+    # Rows of every selected version, looked up in the per-product index
+    groups = products_series(products, start_date, end_date)
+
+    # Grouped bars of each version's average discount on every platform
+    fig_bar = bar_figure(
+        DISCOUNT_COLUMNS,
+        {name: rows[DISCOUNT_COLUMNS].mean().to_numpy() for name, rows in groups.items()},
+        title=f'Average Discount for {len(products)} Products',
+        x_title="Platform Names",
+        y_title="Discount (%)",
+        legend_title='Product',
+        barmode='group',
     )
 
-    fig_box.update_layout(
-        title_text=f'Discount Comparison for {selected_version}',
-        title_x=0.5,
-        template='plotly_dark',
-        xaxis_title="Platform Names",  
-        yaxis_title="Discount (%)", 
+    # Box plots of the versions' discounts, grouped by platform (outliers shown)
+    fig_box = grouped_box_figure(
+        {name: {col: rows[col].dropna() for col in DISCOUNT_COLUMNS} for name, rows in groups.items()},
+        title=f'Discount Comparison for {len(products)} Products',
+        x_title="Platform Names",
+        y_title="Discount (%)",
+        legend_title='Product',
     )
 
-    return fig_box, fig_bar  # Return both figures for display
+    return fig_box, fig_bar
 
 ####################### WIDGETS #################################
-# Define available product types
-types = ['Mobile', 'Headphones', 'Watch']
-
-# Dropdown for selecting product type
+# Dropdown for selecting product type (options filled from the catalog)
 type_dd = dcc.Dropdown(
     id='type-dropdown-discount', 
-    options=[{'label': t, 'value': t} for t in types], 
     value='Mobile', 
     clearable=False
 )
 
 # Dropdowns for selecting company and version, initially empty
 company_dd = dcc.Dropdown(id='company-dropdown-discount')
-version_dd = dcc.Dropdown(id='version-dropdown-discount', style={'marginBottom': '10px'})
+version_dd = dcc.Dropdown(id='version-dropdown-discount', multi=True)
+date_range = dcc.DatePickerRange(id='date-range-discount', display_format='DD-MM-YYYY', style={'marginBottom': '10px'})
 
 ####################### PAGE LAYOUT ##############################
 # Define layout structure with dropdowns and graphs
@@ -124,45 +90,63 @@ layout = html.Div([
     type_dd,  # Product Type Dropdown
     html.P("Select Company:"),
     company_dd,  # Company Dropdown
-    html.P("Select Version:"),
+    html.P("Select Versions:"),
     version_dd,  # Product Version Dropdown
-    dcc.Graph(id='discount-graph', style={'width': '100%'}),  # Box plot graph
-    dcc.Graph(id='bar-graph', style={'width': '100%'})  # Bar chart graph
+    html.P("Select Dates:"),
+    date_range,  # Date Range Picker
+    dcc.Loading(dcc.Graph(id='discount-graph', style={'width': '100%'})),  # Box plot graph
+    dcc.Loading(dcc.Graph(id='bar-graph', style={'width': '100%'}))  # Bar chart graph
 ], className="p-4 m-2")
 
 ####################### CALLBACKS ################################
+# Fill the type dropdown with the product types of the catalog
+@callback(
+    Output('type-dropdown-discount', 'options'),
+    [Input('type-dropdown-discount', 'id')]
+)
+def update_type_dropdown(_):
+    return type_options()
+
 # Update company dropdown options based on selected type
 @callback(
     Output('company-dropdown-discount', 'options'),
     [Input('type-dropdown-discount', 'value')]
 )
 def update_company_dropdown(selected_type):
-    # Get unique companies for the selected product type
-    companies = df[df['Type'] == selected_type]['Company'].unique()
-    return [{'label': c, 'value': c} for c in companies]
+    # Companies of the selected type, looked up in the precomputed catalog index
+    return company_options(selected_type)
 
-# Update version dropdown options based on selected company
+# Update version dropdown options based on selected company (selected versions stay
+# listed, and the selection is capped)
 @callback(
     Output('version-dropdown-discount', 'options'),
-    [Input('company-dropdown-discount', 'value')]
+    [Input('company-dropdown-discount', 'value'), Input('version-dropdown-discount', 'value')]
 )
-def update_version_dropdown(selected_company):
-    if selected_company is None:
-        return []  # Return empty if no company is selected
+def update_version_dropdown(selected_company, selected_version=None):
+    # Product versions of the selected company, looked up in the precomputed catalog index
+    return compare_version_options(selected_company, selected_version)
 
-    # Get unique product versions for the selected company
-    versions = df[df['Company'] == selected_company]['Product Name'].unique()
-    return [{'label': v, 'value': v} for v in versions]
+# Reset the date range to the selected versions' history
+@callback(
+    [Output('date-range-discount', 'min_date_allowed'), Output('date-range-discount', 'max_date_allowed'),
+     Output('date-range-discount', 'start_date'), Output('date-range-discount', 'end_date')],
+    [Input('version-dropdown-discount', 'value')]
+)
+def update_date_range(selected_version):
+    return date_picker_range(selected_versions(selected_version))
 
-# Update graphs based on selected version
+# Update graphs based on selected versions and date range
 @callback(
     [Output('discount-graph', 'figure'), Output('bar-graph', 'figure')],
-    [Input('version-dropdown-discount', 'value')]
+    [Input('version-dropdown-discount', 'value'),
+     Input('date-range-discount', 'start_date'), Input('date-range-discount', 'end_date')]
 )
-def update_discount_graph(selected_version):
-    if selected_version is None:
+def update_discount_graph(selected_version, start_date=None, end_date=None):
+    products = selected_versions(selected_version)
+    if not products:
         return {}, {}  # Return empty figures if no version is selected
 
-    # Generate both figures using the selected version
-    fig_box, fig_bar = create_discount_comparison(selected_version)
+    # Generate both figures using the selected versions (cached per selection and range)
+    fig_box, fig_bar = cached_figures('discount-comparison', (tuple(products), start_date, end_date), ['box', 'bar'],
+                                      lambda: create_discount_comparison(products, start_date, end_date))
     return fig_bar, fig_box  # Return both figures
@@ -0,0 +1,233 @@
+import dash
+from dash import dcc, html, callback, clientside_callback, ClientsideFunction, MATCH
+from dash.dependencies import Input, Output, State
+from data import type_options, company_options, version_options
+from product_stats import product_series, price_summary, price_histogram, rolling_column, date_picker_range
+from downsample import downsample_frame
+from figures import line_figure, histogram_figure, summary_box_figure
+from figure_cache import cached_figures
+from clientside import CLIENTSIDE, NAMESPACE, PLATFORM_FIGURES, chart_config, product_arrays
+
+####################### PLATFORMS ################################
+# One analytics page per marketplace. Every page reads the shared product frame and the
+# shared precomputed tables, and all pages share one set of pattern-matching callbacks,
+# so adding a marketplace only takes another entry here (and its 'Price On ...' column).
+PLATFORM_PAGES = [
+    {
+        'key': 'amazon',
+        'platform': 'Amazon',
+        'path': '/analytics',
+        'name': "Amazon🛒",
+        'order': 5,
+        'color': '#ff5733',
+        'titles': {
+            'line': "Product Price Over Time",
+            'histogram': "Distribution of Product Prices",
+            'box': "Price Distribution",
+            'rolling': "3-Day Rolling Mean of Price",
+        },
+    },
+    {
+        'key': 'flipkart',
+        'platform': 'Flipkart',
+        'path': '/flipkart_analytics',
+        'name': "Flipkart🛒",
+        'order': 6,
+        'color': None,
+        'titles': {
+            'line': "Price Over Time",
+            'histogram': "Distribution of Prices",
+            'box': "Price Distribution",
+            'rolling': "3-Day Rolling Mean of Product Price",
+        },
+    },
+    {
+        'key': 'jiomart',
+        'platform': 'Jiomart',
+        'path': '/jiomart_analytics',
+        'name': "Jiomart🛒",
+        'order': 7,
+        'color': None,
+        'titles': {
+            'line': "Price Over Time",
+            'histogram': "Product Price Distribution",
+            'box': "Price Distribution",
+            'rolling': "3-Day Rolling Mean for Product Price",
+        },
+    },
+]
+PAGES_BY_KEY = {page['key']: page for page in PLATFORM_PAGES}
+
+# Window of the rolling-mean chart (must be one of product_stats.ROLLING_WINDOWS)
+ROLLING_WINDOW = 3
+
+GRAPH_KINDS = ['line', 'histogram', 'box', 'rolling']
+
+
+# Pattern-matching component id of one platform page
+def component_id(component, key, **extra):
+    return {'type': f'platform-{component}', 'platform': key, **extra}
+
+
+def price_column(page):
+    return f"Price On {page['platform']}"
+
+####################### CHARTS ###################################
+
+def create_line_chart(page, series):
+    col = price_column(page)
+    series = downsample_frame(series, 'Date', [col])
+    return line_figure(series['Date'], {col: series[col]},
+                       page['titles']['line'], 'Date', col, color=page['color'])
+
+# Histogram drawn from the precomputed (counts, bin edges) of the product
+def create_histogram(page, hist):
+    col = price_column(page)
+    return histogram_figure(hist, page['titles']['histogram'], col, color=page['color'])
+
+# Box plot drawn from the precomputed five-number summary of the product
+def create_box_plot(page, summary):
+    col = price_column(page)
+    return summary_box_figure(col, summary, page['titles']['box'], col)
+
+# Rolling mean read from the precomputed per-product series
+def create_rolling_plot(page, series):
+    rolling_col = rolling_column(price_column(page), ROLLING_WINDOW)
+    series = downsample_frame(series, 'Date', [rolling_col])
+    return line_figure(series['Date'], {rolling_col: series[rolling_col]},
+                       page['titles']['rolling'], 'Date', rolling_col)
+
+# Build all four charts of one platform page for one product version and date range
+def build_graphs(page, selected_version, start_date=None, end_date=None):
+    col = price_column(page)
+    series = product_series(selected_version, start_date, end_date)
+
+    fig_line = create_line_chart(page, series)
+    fig_histogram = create_histogram(page, price_histogram(selected_version, col, start_date, end_date))
+    fig_box = create_box_plot(page, price_summary(selected_version, col, start_date, end_date))
+    fig_rolling = create_rolling_plot(page, series)
+
+    return fig_line, fig_histogram, fig_box, fig_rolling
+
+####################### LAYOUT ###################################
+# The type options are filled in from the catalog by update_type_dropdown
+def platform_layout(page):
+    key = page['key']
+
+    # In client-side mode the selected product's arrays and the static chart settings are
+    # kept in two stores and assets/charts.js draws the charts in the browser
+    client_stores = [
+        dcc.Store(id=component_id('series', key)),
+        dcc.Store(id=component_id('chart-config', key), data=chart_config(
+            price_column(page), page['titles'], color=page['color'], rolling_window=ROLLING_WINDOW)),
+    ] if CLIENTSIDE else []
+
+    return html.Div([
+        html.H1(f"{page['platform']} Product Price & Discount Analysis", style={'textAlign': 'center'}),
+        html.P("Select Type:"),
+        dcc.Dropdown(
+            id=component_id('type', key),
+            value='Mobile',
+            clearable=False
+        ),
+        html.P("Select Company:"),
+        dcc.Dropdown(id=component_id('company', key)),
+        html.P("Select Version:"),
+        dcc.Dropdown(id=component_id('version', key)),
+        html.P("Select Dates:"),
+        dcc.DatePickerRange(id=component_id('dates', key), display_format='DD-MM-YYYY',
+                            style={'marginBottom': '10px'}),
+
+        # Each graph in a 2x2 arrangement
+        html.Div(style={'display': 'flex', 'flexWrap': 'wrap', 'justifyContent': 'space-between', 'width': '100%'}, children=[
+            html.Div(dcc.Loading(dcc.Graph(id=component_id('graph', key, kind=kind))), style={'flex': '0 0 49%', 'margin': '0%'})
+            for kind in GRAPH_KINDS
+        ]),
+        *client_stores,
+    ], className="p-4 m-2")
+
+
+# Register one page per platform; the layouts are built once at import time
+for page in PLATFORM_PAGES:
+    dash.register_page(f"pages.{page['key']}_analytics", path=page['path'], name=page['name'],
+                       order=page['order'], layout=platform_layout(page))
+
+####################### CALLBACKS ################################
+# Each callback below serves every platform page: MATCH pairs the inputs and outputs
+# of the page whose dropdown changed.
+GRAPH_OUTPUTS = [Output(component_id('graph', MATCH, kind=kind), 'figure') for kind in GRAPH_KINDS]
+
+
+@callback(
+    Output(component_id('type', MATCH), 'options'),
+    Input(component_id('type', MATCH), 'id')
+)
+def update_type_dropdown(_):
+    # Product types of the catalog, filled in when the page is rendered
+    return type_options()
+
+@callback(
+    Output(component_id('company', MATCH), 'options'),
+    Input(component_id('type', MATCH), 'value')
+)
+def update_company_dropdown(selected_type):
+    # Companies of the selected type, looked up in the precomputed catalog index
+    return company_options(selected_type)
+
+@callback(
+    Output(component_id('version', MATCH), 'options'),
+    Input(component_id('company', MATCH), 'value')
+)
+def update_version_dropdown(selected_company):
+    # Product versions of the selected company, looked up in the precomputed catalog index
+    return version_options(selected_company)
+
+# Reset the date range to the selected product's history
+@callback(
+    [Output(component_id('dates', MATCH), 'min_date_allowed'),
+     Output(component_id('dates', MATCH), 'max_date_allowed'),
+     Output(component_id('dates', MATCH), 'start_date'),
+     Output(component_id('dates', MATCH), 'end_date')],
+    Input(component_id('version', MATCH), 'value')
+)
+def update_date_range(selected_version):
+    return date_picker_range(selected_version)
+
+DATE_INPUTS = [Input(component_id('dates', MATCH), 'start_date'), Input(component_id('dates', MATCH), 'end_date')]
+
+if CLIENTSIDE:
+    # Send the selected product's dates and prices to the browser once per date range
+    @callback(
+        Output(component_id('series', MATCH), 'data'),
+        Input(component_id('version', MATCH), 'value'),
+        *DATE_INPUTS,
+        State(component_id('version', MATCH), 'id')
+    )
+    def update_series(selected_version, start_date, end_date, version_id):
+        page = PAGES_BY_KEY[version_id['platform']]
+        return product_arrays(selected_version, price_column(page), start_date, end_date, ROLLING_WINDOW)
+
+    # Build the four charts in the browser from the stored arrays
+    clientside_callback(
+        ClientsideFunction(namespace=NAMESPACE, function_name=PLATFORM_FIGURES),
+        GRAPH_OUTPUTS,
+        Input(component_id('series', MATCH), 'data'),
+        Input(component_id('chart-config', MATCH), 'data')
+    )
+else:
+    # Callback for updating all graphs of a platform page based on the selected version
+    @callback(
+        GRAPH_OUTPUTS,
+        Input(component_id('version', MATCH), 'value'),
+        *DATE_INPUTS,
+        State(component_id('version', MATCH), 'id')
+    )
+    def update_graphs(selected_version, start_date, end_date, version_id):
+        if selected_version is None:
+            return [{}] * 4
+
+        # Figures are cached per platform, product and date range, so the charts are only
+        # built on a cache miss
+        page = PAGES_BY_KEY[version_id['platform']]
+        return cached_figures(f"{page['key']}_analytics", (selected_version, start_date, end_date), GRAPH_KINDS,
+                              lambda: build_graphs(page, selected_version, start_date, end_date))
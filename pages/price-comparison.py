@@ -1,106 +1,115 @@
-import pandas as pd
 import dash
+import numpy as np
 from dash import dcc, html, callback
-import plotly.express as px
 from dash.dependencies import Input, Output
+from data import type_options, company_options, compare_version_options, selected_versions, PRICE_COLUMNS
+from downsample import MAX_POINTS, downsample_frame
+from figures import line_figure, box_figure, faceted_line_figure, grouped_box_figure, forecast_traces, COLORWAY
+from figure_cache import cached_figures
+from forecast import price_forecast
+from product_stats import date_picker_range, product_series, products_series
 
 # Registering the page in Dash with custom settings for URL, name, and order
 dash.register_page(__name__, path='/price-comparison', name="Price Comparison 📈", order=3)
 
-####################### LOAD DATASET #############################
-# Loading multiple Excel files containing product price data from different companies
-df_vivo = pd.read_excel('analysispart3/vivo.xlsx')
-df_motorola = pd.read_excel('analysispart3/moto.xlsx')
-df_redmi = pd.read_excel('analysispart3/redmi.xlsx')
-df_iphone13 = pd.read_excel('analysispart3/iphone13.xlsx')
-df_iphone14 = pd.read_excel('analysispart3/iphone14.xlsx')
-df_iphone15 = pd.read_excel('analysispart3/iphone15.xlsx')
-df_boat = pd.read_excel('analysispart3/boat.xlsx')
-df_redmi_buds = pd.read_excel('analysispart3/redmi_buds.xlsx')
-df_realme_buds = pd.read_excel('analysispart3/realme_buds.xlsx')
-df_boat_watch = pd.read_excel('analysispart3/boat_watch.xlsx')
-
-# Adding product category ('Type') and brand ('Company') labels to each dataset
-df_vivo['Type'] = 'Mobile'
-df_vivo['Company'] = 'Vivo'
-df_boat_watch['Type'] = 'Watch'
-df_boat_watch['Company'] = 'boAt Watch'
-df_motorola['Type'] = 'Mobile'
-df_motorola['Company'] = 'Motorola'
-df_redmi['Type'] = 'Mobile'
-df_redmi['Company'] = 'Redmi'
-df_iphone13['Type'] = 'Mobile'
-df_iphone13['Company'] = 'iPhone'
-df_iphone14['Type'] = 'Mobile'
-df_iphone14['Company'] = 'iPhone'
-df_iphone15['Type'] = 'Mobile'
-df_iphone15['Company'] = 'iPhone'
-df_boat['Type'] = 'Headphones'
-df_boat['Company'] = 'boAt'
-df_redmi_buds['Type'] = 'Headphones'
-df_redmi_buds['Company'] = 'Redmi Buds'
-df_realme_buds['Type'] = 'Headphones'
-df_realme_buds['Company'] = 'Realme Buds'
-
-# Combining all individual dataframes into a single unified DataFrame for analysis
-df = pd.concat([df_vivo, df_motorola, df_redmi, df_iphone13, df_iphone14, df_iphone15, df_boat, df_redmi_buds, df_realme_buds, df_boat_watch])
-
-# Handling missing discount data in the 'Discount On Jiomart' column by filling NaNs with 0
-df['Discount On Jiomart'] = df['Discount On Jiomart'].fillna(0)
-df['Discount On Amazon'] = df['Discount On Amazon'].fillna(0)
-df['Discount On Flipkart'] = df['Discount On Flipkart'].fillna(0)
 ####################### PRICE COMPARISON ##########################
-# Function to create a price comparison plot for the selected product version
-def create_price_comparison(selected_version):
-    # Filter the DataFrame for the selected product version
-    filtered_df = df.loc[df['Product Name'] == selected_version]
+# Precomputed forecast of a product's prices on one platform, if the date range reaches
+# the product's last scraped day (the forecast starts the day after it)
+def visible_forecast(product, col, end_date=None):
+    forecast = price_forecast(product, col)
+    if forecast is None or (end_date and np.datetime64(end_date[:10], 'D') + 1 < forecast['dates'][0]):
+        return None
+    return forecast
+
+# Function to create a price comparison plot for the selected product version(s)
+# (optionally limited to a date range)
+def create_price_comparison(selected_version, start_date=None, end_date=None, show_forecast=True):
+    products = selected_versions(selected_version)
+    if len(products) > 1:
+        return create_multi_price_comparison(products, start_date, end_date, show_forecast)
+    selected_version = products[0] if products else None
+
+    # Date-sorted rows of the selected product version, sliced to the date range
+    filtered_df = product_series(selected_version, start_date, end_date)
 
     # Line plot to compare prices across Amazon, Flipkart, and Jiomart over time
-    fig_line = px.line(
-        data_frame=filtered_df,
-        x='Date',
-        y=['Price On Amazon', 'Price On Flipkart', 'Price On Jiomart'],
+    # (long histories are downsampled to the chart's point budget, keeping price extremes)
+    line_df = downsample_frame(filtered_df, 'Date', PRICE_COLUMNS)
+    fig_line = line_figure(
+        line_df['Date'],
+        {col: line_df[col] for col in PRICE_COLUMNS},
         title=f'Price Comparison for {selected_version}',
-        labels={'value': 'Price', 'variable': 'Platform'},  # Labels for better clarity
+        x_title='Date',
+        y_title='Price (in Indian Rupees)',
+        legend_title='Platform',
     )
 
-    # Box plot to show price distribution across the three platforms
-    fig_box = px.box(
-        data_frame=filtered_df,
-        y=['Price On Amazon', 'Price On Flipkart', 'Price On Jiomart'],
+    # Forecast of each platform's price as a dashed line with its interval band
+    if show_forecast:
+        for i, col in enumerate(PRICE_COLUMNS):
+            forecast = visible_forecast(selected_version, col, end_date)
+            if forecast is not None:
+                fig_line['data'] += forecast_traces(forecast['dates'], forecast['mean'], forecast['lower'],
+                                                    forecast['upper'], f'{col} forecast', COLORWAY[i % len(COLORWAY)])
+                fig_line['layout']['showlegend'] = True
+
+    # Box plot to show price distribution across the three platforms (outliers shown)
+    fig_box = box_figure(
+        {col: filtered_df[col] for col in PRICE_COLUMNS},
         title=f'Price Distribution for {selected_version}',
-        points='outliers',  # Show outliers in the distribution
+        x_title="Platform Names",
+        y_title='Price (in Indian Rupees)',
     )
 
-    # Applying dark theme and centering titles for better visual consistency
-    fig_line.update_layout(
-        title_text=f'Price Comparison for {selected_version}',
-        title_x=0.5,
-        template='plotly_dark',
-    )
-    fig_box.update_layout(
-        title_text=f'Price Distribution for {selected_version}',
-        title_x=0.5,
-        template='plotly_dark',
-        xaxis_title="Platform Names",
-        yaxis_title="Discount (%)",
+    return fig_line, fig_box  # Return both line and box plot figures
+
+# Function to compare several product versions: one line panel per platform with a line
+# per product (shared axes), and the products' price distributions side by side
+def create_multi_price_comparison(products, start_date=None, end_date=None, show_forecast=True):
+    # Rows of every selected product, looked up in the per-product index
+    groups = products_series(products, start_date, end_date)
+
+    # Each product's lines get an equal share of the point budget
+    budget = MAX_POINTS // len(products) if MAX_POINTS else 0
+    lines = {name: downsample_frame(rows, 'Date', PRICE_COLUMNS, budget) for name, rows in groups.items()}
+    fig_line = faceted_line_figure(
+        {col: {name: (rows['Date'], rows[col]) for name, rows in lines.items()} for col in PRICE_COLUMNS},
+        title=f'Price Comparison for {len(products)} Products',
+        x_title='Date',
+        y_title='Price (in Indian Rupees)',
+        legend_title='Product',
     )
 
-    # Customizing axes labels
-    fig_line.update_xaxes(title_text='Date')
-    fig_line.update_yaxes(title_text='Price (in Indian Rupees)')
-    fig_box.update_yaxes(title_text='Price (in Indian Rupees)')
+    # Forecasts drawn in each product's color on the panel of their platform
+    if show_forecast:
+        colors = {trace['name']: trace['line']['color'] for trace in fig_line['data']}
+        for row, col in enumerate(PRICE_COLUMNS, start=1):
+            suffix = '' if row == 1 else str(row)
+            for name in groups:
+                forecast = visible_forecast(name, col, end_date)
+                if forecast is not None and name in colors:
+                    fig_line['data'] += forecast_traces(
+                        forecast['dates'], forecast['mean'], forecast['lower'], forecast['upper'],
+                        f'{name} forecast', colors[name], (f'x{suffix}', f'y{suffix}'), showlegend=row == 1)
+
+    fig_box = grouped_box_figure(
+        {name: {col: rows[col].dropna() for col in PRICE_COLUMNS} for name, rows in groups.items()},
+        title=f'Price Distribution for {len(products)} Products',
+        x_title="Platform Names",
+        y_title='Price (in Indian Rupees)',
+        legend_title='Product',
+    )
 
-    return fig_line, fig_box  # Return both line and box plot figures
+    return fig_line, fig_box
 
 ####################### WIDGETS ################################
-# Define options for the 'Type' dropdown menu
-types = ['Mobile', 'Headphones', 'Watch']
-
-# Create dropdowns for type, company, and version selection
-type_dd = dcc.Dropdown(id='type-dropdown', options=[{'label': t, 'value': t} for t in types], value='Mobile', clearable=False)
+# Create dropdowns for type, company, and version selection (the types come from the catalog)
+type_dd = dcc.Dropdown(id='type-dropdown', value='Mobile', clearable=False)
 company_dd = dcc.Dropdown(id='company-dropdown-price')
-version_dd = dcc.Dropdown(id='version-dropdown-price', style={'marginBottom': '10px'})
+version_dd = dcc.Dropdown(id='version-dropdown-price', multi=True)
+date_range = dcc.DatePickerRange(id='date-range-price', display_format='DD-MM-YYYY')
+forecast_toggle = dcc.Checklist(id='forecast-price', options=[{'label': ' Show price forecast', 'value': 'show'}],
+                                value=['show'], style={'marginTop': '10px', 'marginBottom': '10px'})
 
 ####################### PAGE LAYOUT #############################
 # Defining the layout of the page, including dropdowns and graphs
@@ -114,53 +123,71 @@ layout = html.Div([
     html.P("Select Company:"),
     company_dd,  # Company Dropdown
 
-    html.P("Select Version:"),
+    html.P("Select Versions:"),
     version_dd,  # Version Dropdown
 
+    html.P("Select Dates:"),
+    date_range,  # Date Range Picker
+    forecast_toggle,  # Forecast overlay switch
+
     # Graphs for price comparison and distribution
-    dcc.Graph(id='price-graph', style={'width': '100%'}),  # Line Plot for Price Comparison
-    dcc.Graph(id='box-graph', style={'width': '100%'})  # Box Plot for Price Distribution
+    dcc.Loading(dcc.Graph(id='price-graph', style={'width': '100%'})),  # Line Plot for Price Comparison
+    dcc.Loading(dcc.Graph(id='box-graph', style={'width': '100%'}))  # Box Plot for Price Distribution
 ], className="p-4 m-2")
 
 ####################### CALLBACKS ################################
+# Callback to fill the type dropdown with the product types of the catalog
+@callback(
+    Output('type-dropdown', 'options'),
+    Input('type-dropdown', 'id')
+)
+def update_type_dropdown(_):
+    return type_options()
+
 # Callback to update the company dropdown based on the selected type
 @callback(
     Output('company-dropdown-price', 'options'),
     Input('type-dropdown', 'value')
 )
 def update_company_dropdown(selected_type):
-    if selected_type is None:
-        return []  # Return empty if no type is selected
+    # Companies of the selected type, looked up in the precomputed catalog index
+    return company_options(selected_type)
 
-    # Get unique company names based on selected type
-    companies = df[df['Type'] == selected_type]['Company'].unique()
-    return [{'label': c, 'value': c} for c in companies]
-
-# Callback to update the version dropdown based on the selected company
+# Callback to update the version dropdown based on the selected company; versions that
+# are already selected stay in the list, and the selection is capped
 @callback(
     Output('version-dropdown-price', 'options'),
-    Input('company-dropdown-price', 'value')
+    [Input('company-dropdown-price', 'value'), Input('version-dropdown-price', 'value')]
 )
-def update_version_dropdown(selected_company):
-    # Return an empty list if no company is selected
-    if not selected_company:
-        return []
-
-    # Get unique product names for the selected company, dropping any NaN values
-    versions = df[df['Company'] == selected_company]['Product Name'].dropna().unique()
+def update_version_dropdown(selected_company, selected_version=None):
+    # Product versions of the selected company, looked up in the precomputed catalog index
+    return compare_version_options(selected_company, selected_version)
 
-    # Return the options in the required format
-    return [{'label': v, 'value': v} for v in versions]
+# Callback to reset the date range to the selected product versions' history
+@callback(
+    [Output('date-range-price', 'min_date_allowed'), Output('date-range-price', 'max_date_allowed'),
+     Output('date-range-price', 'start_date'), Output('date-range-price', 'end_date')],
+    Input('version-dropdown-price', 'value')
+)
+def update_date_range(selected_version):
+    return date_picker_range(selected_versions(selected_version))
 
-# Callback to update both the line and box plots based on the selected product version
+# Callback to update both the line and box plots based on the selected product version and dates
 @callback(
     [Output('price-graph', 'figure'), Output('box-graph', 'figure')],
-    Input('version-dropdown-price', 'value')
+    [Input('version-dropdown-price', 'value'),
+     Input('date-range-price', 'start_date'), Input('date-range-price', 'end_date'),
+     Input('forecast-price', 'value')]
 )
-def update_price_graph(selected_version):
-    if selected_version is None:
+def update_price_graph(selected_version, start_date=None, end_date=None, forecast=('show',)):
+    products = selected_versions(selected_version)
+    if not products:
         return {}, {}  # Return empty figures if no version is selected
 
-    # Generate both line and box plot figures using the helper function
-    fig_line, fig_box = create_price_comparison(selected_version)
+    # Generate both line and box plot figures using the helper function (cached per selection,
+    # range and forecast switch)
+    show_forecast = bool(forecast and 'show' in forecast)
+    fig_line, fig_box = cached_figures('price-comparison', (tuple(products), start_date, end_date, show_forecast),
+                                       ['line', 'box'],
+                                       lambda: create_price_comparison(products, start_date, end_date, show_forecast))
     return fig_line, fig_box  # Return both figures
@@ -0,0 +1,240 @@
+# Per-product analytics tables used by the chart pages.
+# Rolling means, five-number summaries and histogram bins only change when the data
+# does, so they are computed once per data version for every product and platform,
+# and the chart callbacks just look them up (they never write to the shared frame).
+# Every product's rows are kept sorted by date, so a date range is a binary-search
+# slice of that product's rows rather than a mask over the whole frame.
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from data import get_database, get_products, get_data_version, PRICE_COLUMNS, DISCOUNT_COLUMNS
+from metrics import observe_load
+from storage import iter_products, product_rows, use_sqlite
+
+####################### CONFIGURATION ###########################
+# Rolling-mean window sizes (in rows, one row per scraped day), e.g. "3,7,14"
+ROLLING_WINDOWS = [int(w) for w in os.environ.get('ECOM_ROLLING_WINDOWS', '3,7').split(',') if w.strip()]
+
+# Number of bins of the price histograms
+HISTOGRAM_BINS = int(os.environ.get('ECOM_HISTOGRAM_BINS', 20))
+
+# Days of history the date pickers select when a product is chosen (0 = all of it)
+DEFAULT_RANGE_DAYS = int(os.environ.get('ECOM_DEFAULT_RANGE_DAYS', 0))
+
+# Products whose series are kept in memory when they are read from SQLite storage
+PRODUCT_CACHE_SIZE = int(os.environ.get('ECOM_PRODUCT_CACHE_SIZE', 256))
+
+
+# Name of the rolling-mean column for a price column and window size
+def rolling_column(price_col, window):
+    return f'{price_col} rolling {window}'
+
+####################### BUILD TABLES #############################
+
+# Quartiles (linear interpolation, as plotly uses), min/max and the whisker ends
+# (furthest values within 1.5 IQR of the box, as in a standard box plot)
+def five_number_summary(values):
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    return {
+        'min': values.min(),
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'max': values.max(),
+        'mean': values.mean(),
+        'lowerfence': values[values >= q1 - 1.5 * iqr].min(),
+        'upperfence': values[values <= q3 + 1.5 * iqr].max(),
+        'count': len(values),
+    }
+
+
+def build_stats(df):
+    # Date-sorted prices and discounts of every product with the rolling means of the prices
+    series = df[['Product Name', 'Date'] + PRICE_COLUMNS + DISCOUNT_COLUMNS].sort_values(
+        ['Product Name', 'Date'], kind='stable')
+    grouped = series.groupby('Product Name', observed=True, sort=False)
+    for col in PRICE_COLUMNS:
+        for window in ROLLING_WINDOWS:
+            rolling = grouped[col].rolling(window).mean().reset_index(level=0, drop=True)
+            series[rolling_column(col, window)] = rolling
+
+    summaries = []
+    histograms = {}
+    series_by_product = {}
+    dates = {}
+    for product, rows in series.groupby('Product Name', observed=True, sort=False):
+        series_by_product[product] = rows.drop(columns='Product Name').reset_index(drop=True)
+        dates[product] = series_by_product[product]['Date'].to_numpy()
+        for col in PRICE_COLUMNS:
+            values = rows[col].dropna().to_numpy(dtype='float64')
+            if len(values) == 0:
+                continue
+            summaries.append({'Product Name': product, 'Column': col, **five_number_summary(values)})
+            histograms[(product, col)] = np.histogram(values, bins=HISTOGRAM_BINS)
+
+    summary = pd.DataFrame(summaries).set_index(['Product Name', 'Column'])
+    return {'series': series_by_product, 'dates': dates, 'summary': summary, 'histograms': histograms}
+
+# Rolling means of one product's date-sorted prices, added to its series
+def add_rolling_means(series):
+    for col in PRICE_COLUMNS:
+        for window in ROLLING_WINDOWS:
+            series[rolling_column(col, window)] = series[col].rolling(window).mean()
+    return series
+
+####################### LOOKUPS ##################################
+_stats = None  # Tables of the data version in _stats['version']
+_lock = threading.Lock()
+
+
+# Tables of every product (in-memory storage; with SQLite storage the products are read
+# one at a time by _stored_product instead)
+def get_stats():
+    global _stats
+    version = get_data_version()
+    if _stats is None or _stats['version'] != version:
+        with _lock:
+            if _stats is None or _stats['version'] != version:
+                start = time.perf_counter()
+                _stats = dict(build_stats(get_products()), version=version)
+                observe_load('product_stats', time.perf_counter() - start)
+    return _stats
+
+
+####################### SQLITE STORAGE ###########################
+# A product's rows are read from the database (through the (Product Name, Date) index)
+# the first time it is drawn, and the most recent PRODUCT_CACHE_SIZE are kept.
+_products = OrderedDict()  # product -> (series, dates) or None, oldest first
+_products_version = None  # Data version the cached products were read from
+_products_lock = threading.Lock()
+
+
+def _stored_product(product_name):
+    global _products_version
+    version = get_data_version()
+    with _products_lock:
+        if version != _products_version:
+            _products.clear()
+            _products_version = version
+        if product_name in _products:
+            _products.move_to_end(product_name)
+            return _products[product_name]
+
+    rows = product_rows(get_database(), product_name, ['Date'] + PRICE_COLUMNS + DISCOUNT_COLUMNS)
+    entry = None if rows.empty else (add_rolling_means(rows), rows['Date'].to_numpy())
+    with _products_lock:
+        if version == _products_version:
+            _products[product_name] = entry
+            while len(_products) > PRODUCT_CACHE_SIZE:
+                _products.popitem(last=False)
+    return entry
+
+
+# (date-sorted series, dates) of one product from the current storage, or None
+def _product(product_name):
+    if use_sqlite():
+        return _stored_product(product_name)
+    stats = get_stats()
+    series = stats['series'].get(product_name)
+    return None if series is None else (series, stats['dates'][product_name])
+
+
+# (product name, date-sorted series) of every product, e.g. to fit the forecasts
+def iter_product_series():
+    if use_sqlite():
+        return iter_products(get_database(), ['Date'] + PRICE_COLUMNS + DISCOUNT_COLUMNS)
+    return iter(get_stats()['series'].items())
+
+####################### SERIES ###################################
+
+# Rows [i, j) of a product's date-sorted series between two dates (both inclusive,
+# None leaves that end open), found by binary search; None if the product is unknown
+def date_slice(product_name, start_date=None, end_date=None):
+    product = _product(product_name)
+    if product is None:
+        return None
+    dates = product[1]
+    i, j = 0, len(dates)
+    if start_date:
+        i = int(np.searchsorted(dates, pd.Timestamp(start_date).normalize().to_datetime64(), 'left'))
+    if end_date:
+        end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+        j = int(np.searchsorted(dates, end.to_datetime64(), 'left'))
+    return i, max(i, j)
+
+
+def _whole_history(product_name, bounds):
+    return bounds == (0, len(_product(product_name)[1]))
+
+
+# Date-sorted prices, discounts and rolling means of one product, optionally limited to a
+# date range (empty frame if unknown). Rolling means keep the days before the range.
+def product_series(product_name, start_date=None, end_date=None):
+    bounds = date_slice(product_name, start_date, end_date)
+    if bounds is None:
+        columns = (['Date'] + PRICE_COLUMNS + DISCOUNT_COLUMNS
+                   + [rolling_column(c, w) for c in PRICE_COLUMNS for w in ROLLING_WINDOWS])
+        return pd.DataFrame(columns=columns)
+    series = _product(product_name)[0]
+    return series if _whole_history(product_name, bounds) else series.iloc[bounds[0]:bounds[1]]
+
+
+# Valid prices of one product on one platform within the range (float64)
+def _range_prices(product_name, price_col, bounds):
+    series = _product(product_name)[0]
+    return series[price_col].iloc[bounds[0]:bounds[1]].dropna().to_numpy(dtype='float64')
+
+
+# Five-number summary of one product's prices on one platform, or None. Over the whole
+# history it is looked up (in memory); otherwise it is summarized from the slice.
+def price_summary(product_name, price_col, start_date=None, end_date=None):
+    bounds = date_slice(product_name, start_date, end_date)
+    if bounds is None:
+        return None
+    if use_sqlite() or not _whole_history(product_name, bounds):
+        values = _range_prices(product_name, price_col, bounds)
+        return five_number_summary(values) if len(values) else None
+    summary = get_stats()['summary']
+    if (product_name, price_col) not in summary.index:
+        return None
+    return summary.loc[(product_name, price_col)].to_dict()
+
+
+# (counts, bin edges) of one product's prices on one platform, or None
+def price_histogram(product_name, price_col, start_date=None, end_date=None):
+    bounds = date_slice(product_name, start_date, end_date)
+    if bounds is None:
+        return None
+    if use_sqlite() or not _whole_history(product_name, bounds):
+        values = _range_prices(product_name, price_col, bounds)
+        return np.histogram(values, bins=HISTOGRAM_BINS) if len(values) else None
+    return get_stats()['histograms'].get((product_name, price_col))
+
+
+# Date-sorted rows of several products within a date range: product name -> rows (an
+# index lookup per product, in the given order), leaving out products without rows
+def products_series(product_names, start_date=None, end_date=None):
+    frames = {name: product_series(name, start_date, end_date) for name in product_names}
+    return {name: rows for name, rows in frames.items() if not rows.empty}
+
+
+# Date-picker settings for one product or the union of several: (first date, last date,
+# start, end) as ISO dates, the start DEFAULT_RANGE_DAYS before the last date; all None
+# if no product is known
+def date_picker_range(product_names):
+    if product_names is None or isinstance(product_names, str):
+        product_names = [product_names]
+    products = [_product(name) for name in product_names]
+    known = [product[1] for product in products if product is not None and len(product[1]) > 0]
+    if not known:
+        return None, None, None, None
+    first = pd.Timestamp(min(dates[0] for dates in known))
+    last = pd.Timestamp(max(dates[-1] for dates in known))
+    start = max(first, last - pd.Timedelta(days=DEFAULT_RANGE_DAYS - 1)) if DEFAULT_RANGE_DAYS else first
+    return first.date().isoformat(), last.date().isoformat(), start.date().isoformat(), last.date().isoformat()
@@ -0,0 +1,174 @@
+# Storage backends for the combined product table.
+# 'memory' (the default) keeps the whole frame in every process, which is simplest and
+# fastest for a small catalog. 'sqlite' writes the table once per data version to a local
+# SQLite database indexed on (Product Name, Date) and (Type, Company); the callbacks then
+# query just the rows they draw, so a process holds the catalog index and the products it
+# drew recently instead of the full history. Each database file is named after a hash of
+# its contents, so processes loading the same workbooks share one file, and it is swapped
+# in atomically so readers never see a half-written table.
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from metrics import observe_load, set_gauge
+
+####################### CONFIGURATION ###########################
+# 'memory' or 'sqlite'
+BACKEND = os.environ.get('ECOM_STORAGE', 'memory')
+
+# Database files kept in the directory (older data versions may still be open elsewhere)
+KEEP_DATABASES = 3
+
+TABLE = 'products'
+INDEXES = {
+    'products_name_date': ('Product Name', 'Date'),
+    'products_type_company': ('Type', 'Company'),
+}
+
+
+def use_sqlite():
+    return BACKEND == 'sqlite'
+
+
+# Column name quoted for SQL
+def quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+####################### WRITING ##################################
+
+def _content_hash(df):
+    digest = hashlib.sha1(','.join(f'{c}:{t}' for c, t in df.dtypes.astype(str).items()).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _remove_old(directory, keep):
+    paths = sorted(glob.glob(os.path.join(directory, 'products-*.sqlite')), key=os.path.getmtime, reverse=True)
+    for path in paths:
+        if path in keep:
+            continue
+        if len(keep) < KEEP_DATABASES:
+            keep.add(path)
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Write the combined frame to a database in 'directory' (reusing the file when another
+# process already wrote the same data) and return its path
+def write_database(df, directory):
+    start = time.perf_counter()
+    path = os.path.join(directory, f'products-{_content_hash(df)}.sqlite')
+    if os.path.exists(path):
+        os.utime(path)  # Still in use: keep it out of the clean-up
+    else:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with sqlite3.connect(tmp_path) as conn:
+            df.to_sql(TABLE, conn, index=False, chunksize=10000)
+            for name, columns in INDEXES.items():
+                conn.execute(f'CREATE INDEX {name} ON {TABLE} ({", ".join(map(quote, columns))})')
+            # The pandas dtypes, so frames read back match the in-memory ones
+            conn.execute('CREATE TABLE columns (position INTEGER, name TEXT, dtype TEXT)')
+            conn.executemany('INSERT INTO columns VALUES (?, ?, ?)',
+                             [(i, c, str(t)) for i, (c, t) in enumerate(df.dtypes.items())])
+            conn.execute('ANALYZE')
+        conn.close()
+        os.replace(tmp_path, path)
+    _remove_old(directory, {path})
+    observe_load('sqlite_write', time.perf_counter() - start)
+    set_gauge('ecom_sqlite_bytes', os.path.getsize(path))
+    return path
+
+####################### QUERIES ##################################
+_local = threading.local()  # Read-only connections of this thread, by database path
+
+
+def connect(path):
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        for old in connections.values():
+            old.close()  # The data version moved on; one open database per thread
+        connections.clear()
+        conn = connections[path] = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+    return conn
+
+
+# Column names and pandas dtypes of the table, in table order
+@lru_cache(maxsize=KEEP_DATABASES)
+def column_types(path):
+    rows = connect(path).execute('SELECT name, dtype FROM columns ORDER BY position').fetchall()
+    return dict(rows)
+
+
+# Give a query's columns the dtypes they had in memory
+def _typed(path, df):
+    types = column_types(path)
+    for col in df.columns:
+        dtype = types.get(col, '')
+        if dtype.startswith('datetime64'):
+            df[col] = pd.to_datetime(df[col]).astype(dtype)
+        elif dtype.startswith(('int', 'float')):
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_query(path, sql, params=()):
+    return _typed(path, pd.read_sql_query(sql, connect(path), params=list(params)))
+
+
+def count_rows(path, where='', params=()):
+    return connect(path).execute(f'SELECT COUNT(*) FROM {TABLE} {where}', list(params)).fetchone()[0]
+
+
+# Every row of the table (for batch jobs; the callbacks query what they need)
+def read_table(path):
+    return read_query(path, f'SELECT * FROM {TABLE} ORDER BY rowid')
+
+
+# Date-sorted rows of one product (served by the (Product Name, Date) index)
+def product_rows(path, product_name, columns=None):
+    select = ', '.join(map(quote, columns)) if columns else '*'
+    return read_query(path, f'SELECT {select} FROM {TABLE} WHERE "Product Name" = ? ORDER BY "Date"',
+                      [product_name])
+
+
+# The last row of every product on which 'listed_columns' has a price on some platform
+def latest_listed_rows(path, listed_columns):
+    listed = ' OR '.join(f'{quote(c)} > 0' for c in listed_columns)
+    return read_query(path, f'''
+        SELECT p.* FROM {TABLE} p
+        JOIN (SELECT "Product Name" AS name, MAX("Date") AS date FROM {TABLE}
+              WHERE {listed} GROUP BY "Product Name") latest
+          ON p."Product Name" = latest.name AND p."Date" = latest.date
+        ORDER BY p."Product Name", p."Date"
+    ''')
+
+
+# Rows of every product as (product name, date-sorted frame) pairs, read in chunks so
+# only one chunk and the product being assembled are held at a time
+def iter_products(path, columns, chunksize=50000):
+    select = ', '.join(map(quote, ['Product Name'] + columns))
+    sql = f'SELECT {select} FROM {TABLE} ORDER BY "Product Name", "Date"'
+    pending = None
+    for chunk in pd.read_sql_query(sql, connect(path), chunksize=chunksize):
+        chunk = _typed(path, chunk)
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        last = chunk['Product Name'].iat[-1]
+        done, pending = chunk[chunk['Product Name'] != last], chunk[chunk['Product Name'] == last]
+        for name, rows in done.groupby('Product Name', sort=False):
+            yield name, rows.drop(columns='Product Name').reset_index(drop=True)
+    if pending is not None and len(pending):
+        yield pending['Product Name'].iat[0], pending.drop(columns='Product Name').reset_index(drop=True)
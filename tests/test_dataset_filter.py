@@ -0,0 +1,81 @@
+# The Dataset table's filter expressions: parsing, the rows each backend's filter keeps,
+# and bad input that must be ignored rather than fail the callback.
+#
+#   python -m pytest tests/test_dataset_filter.py
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app  # noqa: E402,F401 (registers the pages)
+from storage import TABLE, quote  # noqa: E402
+
+dataset = sys.modules['pages.dataset']
+
+# A few rows shaped like the product table
+ROWS = pd.DataFrame({
+    'Date': pd.to_datetime(['2024-08-01', '2024-08-15', '2024-08-20', '2024-07-01']),
+    'Product Name': ['Motorola Edge 50 Pro', 'Apple iPhone 15', 'Vivo V40 5G', 'Redmi Buds 5'],
+    'Company': pd.Categorical(['Motorola', 'Apple', 'Vivo', 'Redmi']),
+    'Price On Amazon': pd.array([31999, 79900, 34999, 2999], dtype='int32'),
+    'Discount On Jiomart': pd.array([0, 5, 10, 0], dtype='float32'),
+})
+
+# Filter query -> product names it keeps, in row order
+FILTERS = {
+    '{Product Name} contains "Edge 50"': ['Motorola Edge 50 Pro'],
+    '{Product Name} contains Edge 50': ['Motorola Edge 50 Pro'],
+    '{Product Name} contains 15': ['Apple iPhone 15'],
+    '{Product Name} contains EDGE': ['Motorola Edge 50 Pro'],
+    '{Price On Amazon} contains 999': ['Motorola Edge 50 Pro', 'Vivo V40 5G', 'Redmi Buds 5'],
+    '{Date} contains 2024': ['Motorola Edge 50 Pro', 'Apple iPhone 15', 'Vivo V40 5G', 'Redmi Buds 5'],
+    '{Date} datestartswith 01-08': ['Motorola Edge 50 Pro'],
+    '{Price On Amazon} > 32000': ['Apple iPhone 15', 'Vivo V40 5G'],
+    '{Price On Amazon} ge 34999 && {Company} ne Vivo': ['Apple iPhone 15'],
+    '{Company} eq Vivo': ['Vivo V40 5G'],
+    '{Company} = "Apple"': ['Apple iPhone 15'],
+    '{Date} >= 15-08-2024': ['Apple iPhone 15', 'Vivo V40 5G'],
+    '{Discount On Jiomart} ne 0': ['Apple iPhone 15', 'Vivo V40 5G'],
+    # Skipped parts: bad values, values of the wrong type, unknown columns, not a filter
+    '{Date} > foo && {Company} eq Apple': ['Apple iPhone 15'],
+    '{Company} > 5': ['Motorola Edge 50 Pro', 'Apple iPhone 15', 'Vivo V40 5G', 'Redmi Buds 5'],
+    '{Price On Amazon} > abc': ['Motorola Edge 50 Pro', 'Apple iPhone 15', 'Vivo V40 5G', 'Redmi Buds 5'],
+    '{Nope} eq 1 && garbage': ['Motorola Edge 50 Pro', 'Apple iPhone 15', 'Vivo V40 5G', 'Redmi Buds 5'],
+}
+
+
+@pytest.mark.parametrize('filter_part, expected', [
+    ('{Product Name} contains "Edge 50"', ('Product Name', 'contains', 'Edge 50')),
+    ('{Product Name} contains Edge 50', ('Product Name', 'contains', 'Edge 50')),
+    ('{Price On Amazon} >= 1000', ('Price On Amazon', 'ge', '1000')),
+    ('{Company} ne "say \\"hi\\""', ('Company', 'ne', 'say "hi"')),
+    ('{Date} datestartswith 01-08', ('Date', 'datestartswith', '01-08')),
+    ('Edge 50', (None, None, None)),
+])
+def test_split_filter_part(filter_part, expected):
+    assert dataset.split_filter_part(filter_part) == expected
+
+
+@pytest.mark.parametrize('filter_query', list(FILTERS))
+def test_filter_rows(filter_query):
+    kept = dataset.filter_rows(ROWS, filter_query)
+    assert kept['Product Name'].tolist() == FILTERS[filter_query]
+
+
+@pytest.mark.parametrize('filter_query', list(FILTERS))
+def test_filter_sql(filter_query):
+    types = ROWS.dtypes.astype(str).to_dict()
+    where, params = dataset.filter_sql(filter_query, types)
+    with sqlite3.connect(':memory:') as conn:
+        ROWS.to_sql(TABLE, conn, index=False)
+        rows = conn.execute(f'SELECT {quote("Product Name")} FROM {TABLE} {where} ORDER BY rowid', params)
+        assert [name for name, in rows] == FILTERS[filter_query]
+
+
+def test_update_table_ignores_bad_input():
+    sort_by = [{'column_id': 'Nope', 'direction': 'asc'}, {'column_id': 'Price On Amazon', 'direction': 'desc'}]
+    records, _, _ = dataset.update_table(0, 10, sort_by, '{Date} > foo && {Product Name} contains Edge 50')
+    assert records and all('Edge 50' in r['Product Name'] for r in records)
@@ -0,0 +1,121 @@
+# Both storage backends must answer the page callbacks identically.
+# The backend is chosen when storage.py is imported, so each one runs the callbacks on the
+# bundled workbooks in its own Python process (this file run as a script) and the JSON
+# outputs are compared here.
+#
+#   python -m pytest tests/test_storage_parity.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BACKENDS = ['memory', 'sqlite']
+
+# Callback groups compared between the backends
+GROUPS = ['platform.update_graphs', 'price-comparison.update_price_graph',
+          'discount-comparison.update_discount_graph', 'dataset.update_table', 'best_deals.latest_deals']
+
+# (filter query, sort_by) pairs of the Dataset table
+TABLE_QUERIES = [
+    ('', []),
+    ('{Type} contains Mobile', [{'column_id': 'Price On Amazon', 'direction': 'desc'}]),
+    ('{Product Name} contains 15', [{'column_id': 'Product Name', 'direction': 'asc'},
+                                    {'column_id': 'Date', 'direction': 'desc'}]),
+    ('{Price On Amazon} > 20000 && {Company} eq Vivo', [{'column_id': 'Date', 'direction': 'asc'}]),
+    ('{Date} datestartswith 01-08', [{'column_id': 'Discount On Flipkart', 'direction': 'desc'}]),
+    ('{Date} ge 15-08-2024 && {Discount On Jiomart} ne 0', []),
+    ('{Company} contains apple', [{'column_id': 'MRP On Amazon', 'direction': 'asc'}]),
+]
+
+####################### CHILD PROCESS ############################
+
+# Every compared callback output of this process's backend, as JSON
+def callback_outputs():
+    import logging
+    logging.disable(logging.INFO)
+
+    sys.path.insert(0, ROOT)
+    import pandas as pd
+    import app  # noqa: F401 (registers the pages)
+    from plotly.io.json import to_json_plotly
+
+    from best_deals import latest_deals
+    from data import get_catalog, get_database
+    from product_stats import date_picker_range
+
+    pages = sys.modules
+    platform = pages['pages.platform_analytics']
+    price = pages['pages.price-comparison']
+    discount = pages['pages.discount-comparison']
+    dataset = pages['pages.dataset']
+
+    names = [p for companies in get_catalog().values() for products in companies.values() for p in products]
+    outputs = {group: {} for group in GROUPS}
+    for name in names:
+        _, _, start, end = date_picker_range(name)
+        middle = (pd.Timestamp(start) + (pd.Timestamp(end) - pd.Timestamp(start)) / 2).strftime('%Y-%m-%d')
+        for page in platform.PLATFORM_PAGES:
+            version_id = platform.component_id('version', page['key'])
+            outputs['platform.update_graphs'][f"{page['key']} {name}"] = [
+                platform.update_graphs(name, None, None, version_id),
+                platform.update_graphs(name, middle, end, version_id),
+            ]
+        outputs['price-comparison.update_price_graph'][name] = [
+            price.update_price_graph(name), price.update_price_graph(name, start, middle, [])]
+        outputs['discount-comparison.update_discount_graph'][name] = [
+            discount.update_discount_graph(name), discount.update_discount_graph(name, middle, None)]
+    outputs['price-comparison.update_price_graph']['several'] = price.update_price_graph(names[:4])
+    outputs['discount-comparison.update_discount_graph']['several'] = discount.update_discount_graph(names[3:8])
+
+    for query, sort_by in TABLE_QUERIES:
+        for page_current in (0, 3):
+            outputs['dataset.update_table'][f'{query} {sort_by} {page_current}'] = dataset.update_table(
+                page_current, 10, sort_by, query)
+
+    for args in [(), ('Mobile',), ('Mobile', 'Vivo'), (None, None, 5)]:
+        deals = latest_deals(*args)
+        outputs['best_deals.latest_deals'][repr(args)] = json.loads(deals.to_json(orient='split', date_format='iso'))
+
+    outputs['database'] = get_database()
+    return to_json_plotly(outputs)
+
+####################### TESTS ####################################
+
+def _run_backend(backend, tmp_dir):
+    env = dict(os.environ,
+               ECOM_STORAGE=backend,
+               ECOM_SQLITE_DIR=os.path.join(tmp_dir, 'sqlite'),
+               ECOM_CACHE_DIR=os.path.join(tmp_dir, 'cache'),
+               ECOM_RELOAD_INTERVAL='0',
+               ECOM_FORECAST_WORKERS='1')
+    out = subprocess.run([sys.executable, os.path.abspath(__file__)], cwd=ROOT, env=env,
+                         capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout)
+
+
+@pytest.fixture(scope='module')
+def outputs(tmp_path_factory):
+    return {backend: _run_backend(backend, str(tmp_path_factory.mktemp(backend))) for backend in BACKENDS}
+
+
+def test_backends_in_use(outputs):
+    assert outputs['memory']['database'] is None
+    assert outputs['sqlite']['database'].endswith('.sqlite')
+
+
+@pytest.mark.parametrize('group', GROUPS)
+def test_same_callback_output(outputs, group):
+    memory, sqlite = outputs['memory'][group], outputs['sqlite'][group]
+    assert memory  # The workbooks loaded and the callbacks ran
+    assert list(memory) == list(sqlite)
+    for key in memory:
+        assert memory[key] == sqlite[key], f'{group} differs for {key}'
+
+
+if __name__ == '__main__':
+    print(callback_outputs())
@@ -0,0 +1,89 @@
+# Cache warm-up and readiness.
+# The pages register without touching the data; the workbooks are loaded on first use,
+# or ahead of time by warm_up(): in the Gunicorn master before forking (see wsgi.py) or
+# in a background thread so the server answers (the landing page, /healthz, /ready)
+# while the workbooks are still being parsed.
+import logging
+import os
+import sys
+import threading
+import time
+
+from best_deals import get_deals
+from data import get_catalog, get_data_version, workbook_errors
+from forecast import get_forecasts
+from product_stats import date_picker_range, get_stats
+from storage import use_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Build the platform charts of every product while warming up ('0' skips it)
+WARM_FIGURES = os.environ.get('ECOM_WARM_FIGURES', '1') == '1'
+
+_ready = threading.Event()  # Set once the data and the derived tables are loaded
+_thread = None
+_error = None  # Message of the exception that stopped the last warm-up
+
+
+# Load the data and fill the caches the callbacks read from (the forecasts are fitted here too)
+def warm_up(figures=None):
+    global _error
+    figures = WARM_FIGURES if figures is None else figures
+    start = time.perf_counter()
+    try:
+        get_data_version()
+        if not use_sqlite():
+            get_stats()
+        get_deals()
+        get_forecasts()
+    except Exception as exc:
+        _error = f'{type(exc).__name__}: {exc}'
+        logger.exception('Loading the data failed')
+        return
+    _error = None
+    _ready.set()  # The pages can answer now; the figures below are only a head start
+
+    if figures:
+        # The platform pages module was imported by Dash when the app was created. Each
+        # product is warmed with the date range its picker starts with. In client-side
+        # mode the browser draws these charts, so there is nothing to build here.
+        platform = sys.modules.get('pages.platform_analytics')
+        if platform is not None and not platform.CLIENTSIDE:
+            try:
+                for companies in get_catalog().values():
+                    for products in companies.values():
+                        for product in products:
+                            _, _, start_date, end_date = date_picker_range(product)
+                            for page in platform.PLATFORM_PAGES:
+                                platform.update_graphs(product, start_date, end_date,
+                                                       platform.component_id('version', page['key']))
+            except Exception:
+                # The data is loaded; the charts are then built on first request instead
+                logger.exception('Prebuilding the platform charts failed')
+
+    logger.info('Caches warmed in %.2fs', time.perf_counter() - start)
+
+
+# Run warm_up() in a background thread (once per process)
+def start_warm_up(figures=None):
+    global _thread
+    if _ready.is_set() or (_thread is not None and _thread.is_alive()):
+        return _thread
+    _thread = threading.Thread(target=warm_up, args=(figures,), name='cache-warm-up', daemon=True)
+    _thread.start()
+    return _thread
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+# Body of the readiness endpoint
+def readiness():
+    if not _ready.is_set():
+        return {'ready': False, 'error': _error}
+    body = {'ready': True, 'data_version': get_data_version()}
+    skipped = workbook_errors()
+    if skipped:
+        body['skipped_workbooks'] = skipped  # Workbooks that failed validation
+    return body
@@ -0,0 +1,22 @@
+# Production entry point: serve the dashboard with a multi-process WSGI server, e.g.
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server
+#
+# With preload_app (set in gunicorn.conf.py) this module is imported once in the master
+# process. By default the workbooks are read and the per-product tables and chart figures
+# are built there, before the workers fork, so every worker starts warm and shares those
+# pages of memory copy-on-write. With ECOM_PRELOAD=0 the master skips that and each worker
+# warms up in a background thread instead, answering /healthz and /ready right away.
+import os
+
+from app import app
+from warmup import warm_up
+
+# Load the data in the master before forking ('0' defers it to the workers)
+PRELOAD = os.environ.get('ECOM_PRELOAD', '1') == '1'
+
+# The Flask server the WSGI server calls
+server = app.server
+
+if PRELOAD:
+    warm_up()